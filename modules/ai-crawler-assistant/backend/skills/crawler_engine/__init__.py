@@ -0,0 +1,70 @@
+"""
+DataMind 爬虫引擎：列表页抓取、翻页、详情页跟进、附件下载、全站抓取、选择器批量评估等。
+src/agent/skills/crawler/engine.py 与 modules/ai-crawler-assistant/backend/skills/engine.py
+两个命令行入口共用本包，二者的差异通过 config.ENGINE_PROFILES 中的具名配置表达。
+"""
+from .attachments import AttachmentDownloader, attachment_extension
+from .config import (
+    ENGINE_PROFILES,
+    FIELD_KEYWORDS,
+    HEADER_PROFILES,
+    USER_AGENTS,
+    RequestProfile,
+    build_request_headers,
+    field_matches,
+    get_state_dir,
+    register_field_keywords,
+)
+from .core import crawl, follow_details
+from .encoding import detect_encoding
+from .evaluate import evaluate_selectors, load_page
+from .extract import (
+    clean_html,
+    clean_html_content,
+    extract_date_from_text,
+    extract_detail,
+    extract_items,
+    get_field_data,
+    normalize_date,
+    parse_selector,
+)
+from .feeds import discover_feed, iter_feed_items, iter_json_items, map_structured_item, parse_structured
+from .fetch import (
+    BodyLimiter,
+    HttpCache,
+    PolitenessScheduler,
+    RegionCloseDetector,
+    ResponseTooLarge,
+    container_region,
+    prefetch_pages,
+)
+from .frontier import UrlFrontier, VisitedSet, canonicalize_link, url_fingerprint
+from .pagination import detect_pagination_next, infer_url_template
+from .pipeline import ResultPipeline, canonicalize_url, is_valid_row
+from .profiler import CrawlProfiler
+from .site import crawl_site
+from .sinks import CsvSink, ParquetSink, SqliteSink, open_sink
+from .state import CrawlCheckpoint, FingerprintStore, item_fingerprint
+from .table import extract_table, find_table, table_grid
+
+__all__ = [
+    'AttachmentDownloader', 'attachment_extension',
+    'ENGINE_PROFILES', 'FIELD_KEYWORDS', 'HEADER_PROFILES', 'USER_AGENTS', 'RequestProfile',
+    'build_request_headers', 'field_matches', 'get_state_dir', 'register_field_keywords',
+    'crawl', 'follow_details',
+    'detect_encoding',
+    'evaluate_selectors', 'load_page',
+    'clean_html', 'clean_html_content', 'extract_date_from_text', 'extract_detail', 'extract_items',
+    'get_field_data', 'normalize_date', 'parse_selector',
+    'discover_feed', 'iter_feed_items', 'iter_json_items', 'map_structured_item', 'parse_structured',
+    'BodyLimiter', 'HttpCache', 'PolitenessScheduler', 'RegionCloseDetector', 'ResponseTooLarge',
+    'container_region', 'prefetch_pages',
+    'UrlFrontier', 'VisitedSet', 'canonicalize_link', 'url_fingerprint',
+    'detect_pagination_next', 'infer_url_template',
+    'ResultPipeline', 'canonicalize_url', 'is_valid_row',
+    'CrawlProfiler',
+    'crawl_site',
+    'CsvSink', 'ParquetSink', 'SqliteSink', 'open_sink',
+    'CrawlCheckpoint', 'FingerprintStore', 'item_fingerprint',
+    'extract_table', 'find_table', 'table_grid',
+]
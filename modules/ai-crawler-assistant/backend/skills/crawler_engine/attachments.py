@@ -0,0 +1,144 @@
+import hashlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from .config import RequestProfile, get_state_dir
+
+# 附件识别：按扩展名或响应 Content-Type
+ATTACHMENT_EXTENSIONS = {
+    '.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.wps', '.et', '.ofd',
+    '.zip', '.rar', '.7z', '.csv', '.txt'
+}
+
+ATTACHMENT_CONTENT_TYPES = {
+    'application/pdf': '.pdf',
+    'application/msword': '.doc',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx',
+    'application/vnd.ms-excel': '.xls',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': '.xlsx',
+    'application/vnd.ms-powerpoint': '.ppt',
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation': '.pptx',
+    'application/zip': '.zip',
+    'application/x-rar-compressed': '.rar',
+    'application/octet-stream': ''
+}
+
+def attachment_extension(url):
+    """链接路径的附件扩展名，不是附件返回空字符串"""
+    ext = os.path.splitext(urlsplit(url).path)[1].lower()
+    return ext if ext in ATTACHMENT_EXTENSIONS else ''
+
+class AttachmentDownloader:
+    """
+    附件下载：流式写盘，不在内存中缓冲整个文件；已有 .part 时用 Range 断点续传；
+    下载完成后按内容 SHA-256 存储，相同内容只保留一份
+    """
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, download_dir=None, concurrency=4, max_size_mb=200, scheduler=None, request_profile=None):
+        self.download_dir = download_dir or get_state_dir('attachments')
+        os.makedirs(self.download_dir, exist_ok=True)
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.request_profile = request_profile or RequestProfile()
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.http_get = scheduler.wrap(self.session.get) if scheduler is not None else self.session.get
+        self.stats = {"downloaded": 0, "deduplicated": 0, "skipped": 0, "failed": 0}
+
+    def close(self):
+        self.executor.shutdown()
+        self.session.close()
+
+    def download(self, url, referer):
+        """
+        下载单个附件，返回元数据 {"path", "sha256", "size", "content_type", "status"}
+        """
+        part_path = os.path.join(self.download_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.part')
+        headers = self.request_profile.headers(referer)
+        headers['Accept'] = '*/*'
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if offset:
+            headers['Range'] = f'bytes={offset}-'
+
+        with self.http_get(url, headers=headers, timeout=self.request_profile.timeout, stream=True) as response:
+            if response.status_code == 416:
+                # 续传位置越界，说明服务器文件已变化，重新下载
+                os.remove(part_path)
+                return self.download(url, referer)
+            response.raise_for_status()
+
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            ext = attachment_extension(url) or ATTACHMENT_CONTENT_TYPES.get(content_type)
+            if ext is None:
+                return {"status": "skipped", "content_type": content_type}
+
+            sha256 = hashlib.sha256()
+            if response.status_code == 206 and offset:
+                # 续传：先把已下载部分计入哈希
+                with open(part_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b''):
+                        sha256.update(chunk)
+                mode, size = 'ab', offset
+            else:
+                mode, size = 'wb', 0
+
+            with open(part_path, mode) as f:
+                for chunk in response.iter_content(self.CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        f.close()
+                        os.remove(part_path)
+                        return {"status": "skipped", "content_type": content_type, "error": "too large"}
+                    sha256.update(chunk)
+                    f.write(chunk)
+
+        digest = sha256.hexdigest()
+        final_dir = os.path.join(self.download_dir, digest[:2])
+        os.makedirs(final_dir, exist_ok=True)
+        final_path = os.path.join(final_dir, digest + (ext or ''))
+        if os.path.exists(final_path):
+            os.remove(part_path)
+            status = 'deduplicated'
+        else:
+            os.replace(part_path, final_path)
+            status = 'downloaded'
+        return {"path": final_path, "sha256": digest, "size": size, "content_type": content_type, "status": status}
+
+    def download_rows(self, rows, referer):
+        """
+        为每行下载附件：
+        - 名称含“附件”的列表字段（如详情页附件）中的每个链接，元数据直接写回该项
+        - 其余字段中扩展名为附件类型的链接，元数据汇总到该行的“附件文件”字段
+        """
+        # 同一链接可能被多行引用：每个链接只下载一次（同一 .part 文件不能并发写），结果复制到所有引用项
+        jobs = {}
+        for row in rows:
+            for key, value in list(row.items()):
+                if '附件' in key and isinstance(value, list):
+                    for item in value:
+                        if isinstance(item, dict) and item.get('链接'):
+                            jobs.setdefault(item['链接'], []).append(item)
+                elif isinstance(value, str) and value.startswith(('http://', 'https://')) and attachment_extension(value):
+                    item = {"名称": key, "链接": value}
+                    row.setdefault('附件文件', []).append(item)
+                    jobs.setdefault(value, []).append(item)
+
+        def fetch(url):
+            try:
+                return url, self.download(url, referer)
+            except Exception as e:
+                return url, {"status": "failed", "error": str(e)}
+
+        for url, meta in self.executor.map(fetch, jobs):
+            for item in jobs[url]:
+                item.update(meta)
+            self.stats[meta['status']] += 1
+            if meta['status'] == 'failed':
+                print(f'[Attachment] Failed {url}: {meta.get("error")}', file=sys.stderr)
@@ -0,0 +1,102 @@
+import json
+import sys
+import time
+
+from .core import crawl
+from .evaluate import evaluate_selectors
+from .site import crawl_site
+from .sinks import open_sink
+
+
+def main(default_profile='basic', argv=None):
+    """
+    命令行入口：engine.py <source> <selectors_json> [base_url] [pagination_json] [options_json]
+    批量评估选择器：engine.py --evaluate <source> <candidates_json> [base_url] [options_json]
+    全站抓取：engine.py --site <start_url> <selectors_json> [site_json] [options_json]
+    :param default_profile: 未在 options 中指定 engine_profile 时使用的引擎配置
+    """
+    argv = sys.argv if argv is None else argv
+    if len(argv) > 1 and argv[1] == '--evaluate':
+        evaluate_main(default_profile, argv[1:])
+        return
+    if len(argv) > 1 and argv[1] == '--site':
+        site_main(default_profile, argv[1:])
+        return
+    if len(argv) < 3:
+        print(json.dumps({"success": False, "error": "Arguments missing"}))
+        sys.exit(1)
+
+    source_arg = argv[1]
+    selectors_arg = json.loads(argv[2])
+    base_url_arg = argv[3] if len(argv) > 3 else None
+    pagination_arg = json.loads(argv[4]) if len(argv) > 4 else None
+    options_arg = json.loads(argv[5]) if len(argv) > 5 else None
+    options_arg = options_arg or {}
+    options_arg.setdefault('engine_profile', default_profile)
+
+    run_and_print(
+        lambda sink: crawl(source_arg, selectors_arg, base_url_arg, pagination_arg, options_arg, sink=sink),
+        options_arg
+    )
+
+def run_and_print(run, options):
+    """
+    执行抓取并输出结果；run(sink) 返回结果字典
+    """
+    if options.get('sink'):
+        # 直接写入 CSV / SQLite / Parquet，stdout 只输出不含 data 的汇总
+        try:
+            writer = open_sink(options['sink'])
+        except Exception as e:
+            print(json.dumps({"success": False, "error": str(e)}, ensure_ascii=True))
+            return
+        try:
+            result = run(writer.write)
+        finally:
+            writer.close()
+        result.pop('data', None)
+        result['sink'] = writer.stats
+        print(json.dumps(result, ensure_ascii=True))
+    elif options.get('output') == 'ndjson':
+        # 流式输出：每页完成后逐条写出 {"type": "item", "data": {...}}，最后写一条 summary
+        # 直接输出 UTF-8，不做 \uXXXX 转义
+        sys.stdout.reconfigure(encoding='utf-8')
+        started_at = time.time()
+
+        def write_rows(rows):
+            for row in rows:
+                sys.stdout.write(json.dumps({"type": "item", "data": row}, ensure_ascii=False) + '\n')
+            sys.stdout.flush()
+
+        result = run(write_rows)
+        result.pop('data', None)
+        result['type'] = 'summary'
+        result['elapsed_ms'] = int((time.time() - started_at) * 1000)
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+    else:
+        result = run(None)
+        # 使用默认 ensure_ascii=True 以输出 \uXXXX 转义序列，避免终端编码导致的乱码
+        print(json.dumps(result, ensure_ascii=True))
+
+def evaluate_main(default_profile, argv):
+    """--evaluate 模式：argv 为 [--evaluate, source, candidates_json, base_url?, options_json?]"""
+    if len(argv) < 3:
+        print(json.dumps({"success": False, "error": "Arguments missing"}))
+        sys.exit(1)
+
+    options_arg = (json.loads(argv[4]) if len(argv) > 4 else None) or {}
+    options_arg.setdefault('engine_profile', default_profile)
+    result = evaluate_selectors(argv[1], json.loads(argv[2]), argv[3] if len(argv) > 3 else None, options_arg)
+    print(json.dumps(result, ensure_ascii=True))
+
+def site_main(default_profile, argv):
+    """--site 模式：argv 为 [--site, start_url, selectors_json, site_json?, options_json?]"""
+    if len(argv) < 3:
+        print(json.dumps({"success": False, "error": "Arguments missing"}))
+        sys.exit(1)
+
+    site_arg = json.loads(argv[3]) if len(argv) > 3 and argv[3] else None
+    options_arg = (json.loads(argv[4]) if len(argv) > 4 else None) or {}
+    options_arg.setdefault('engine_profile', default_profile)
+    selectors_arg = json.loads(argv[2])
+    run_and_print(lambda sink: crawl_site(argv[1], selectors_arg, site_arg, options_arg, sink=sink), options_arg)
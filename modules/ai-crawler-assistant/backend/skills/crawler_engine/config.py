@@ -0,0 +1,113 @@
+import os
+import random
+
+from urllib3.util.request import ACCEPT_ENCODING
+
+# 常见的 User-Agent 列表
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+]
+
+# 单次请求超时（秒）
+REQUEST_TIMEOUT = 15
+
+# 请求头配置（User-Agent 与 Referer 每次请求单独填充）
+# basic: 精简请求头；browser: 模拟浏览器地址栏导航的完整请求头
+# Accept-Encoding 只声明 urllib3 能解压的编码（gzip、deflate，安装 brotli / zstandard 后含 br / zstd），
+# 避免服务器返回无法解压的 br 正文
+HEADER_PROFILES = {
+    'basic': {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+        'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+        'Accept-Encoding': ACCEPT_ENCODING
+    },
+    'browser': {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+        'Accept-Language': 'zh-CN,zh;q=0.9,en-US;q=0.8,en;q=0.7',
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+        'Sec-Fetch-Dest': 'document',
+        'Sec-Fetch-Mode': 'navigate',
+        'Sec-Fetch-Site': 'none',
+        'Sec-Fetch-User': '?1',
+        'Cache-Control': 'max-age=0'
+    }
+}
+
+# 字段名关键词注册表：按字段名判断字段类别，决定启发式兜底与日期清洗
+#   title_link: 标题/链接类，date: 日期类，type: 类型/分类类
+FIELD_KEYWORDS = {
+    'zh': {
+        'title_link': ['标题', '链接'],
+        'date': ['日期', '时间'],
+        'type': ['类型', '分类']
+    },
+    'zh_en': {
+        'title_link': ['标题', '链接', 'title', 'link', 'url', 'name'],
+        'date': ['日期', '时间', 'date', 'time', 'publish'],
+        'type': ['类型', '分类', 'type', 'category']
+    }
+}
+
+# 引擎配置：两个入口（src/ 与 modules/）历史上的行为差异收敛为具名配置
+#   row_filter: title_or_link 标题或链接非空才保留；any_field 任意字段有值即保留
+ENGINE_PROFILES = {
+    'basic': {"headers": "basic", "timeout": 15, "field_keywords": "zh", "row_filter": "title_or_link"},
+    'browser': {"headers": "browser", "timeout": 20, "field_keywords": "zh_en", "row_filter": "any_field"}
+}
+
+def register_field_keywords(name, keywords):
+    """
+    注册字段关键词表，之后可通过 options.field_keywords = name 使用
+    :param keywords: {"title_link": [...], "date": [...], "type": [...]}
+    """
+    FIELD_KEYWORDS[name] = keywords
+
+def resolve_field_keywords(keywords):
+    """字段关键词可以是注册表中的名称，也可以直接是关键词字典"""
+    if isinstance(keywords, dict):
+        return keywords
+    return FIELD_KEYWORDS[keywords or 'zh']
+
+def field_matches(field_name, kind, keywords=None):
+    """
+    判断字段名是否属于某类字段（title_link / date / type）
+    """
+    if not field_name:
+        return False
+    lowered = field_name.lower()
+    return any(k in lowered for k in (keywords or FIELD_KEYWORDS['zh']).get(kind, ()))
+
+def build_request_headers(referer, profile='basic'):
+    """
+    构造页面请求头（每次随机 User-Agent）
+    """
+    headers = {'User-Agent': random.choice(USER_AGENTS)}
+    headers.update(HEADER_PROFILES[profile] if isinstance(profile, str) else profile)
+    headers['Referer'] = referer
+    return headers
+
+class RequestProfile:
+    """
+    一次抓取任务的请求配置：请求头模板 + 超时，在列表页、详情页、附件下载间共用
+    """
+
+    def __init__(self, headers='basic', timeout=REQUEST_TIMEOUT):
+        self.header_profile = headers
+        self.timeout = timeout
+
+    def headers(self, referer):
+        return build_request_headers(referer, self.header_profile)
+
+def get_state_dir(*parts):
+    """
+    爬虫本地状态目录（增量指纹等），可通过环境变量 CRAWLER_STATE_DIR 覆盖
+    """
+    base = os.environ.get('CRAWLER_STATE_DIR') or os.path.join(os.getcwd(), 'data', 'crawler')
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,572 @@
+import hashlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+
+from .attachments import AttachmentDownloader
+from .config import ENGINE_PROFILES, RequestProfile, resolve_field_keywords
+from .encoding import detect_encoding
+from .extract import extract_detail, extract_items
+from .feeds import discover_feed, parse_structured
+from .fetch import BodyLimiter, HttpCache, PolitenessScheduler, container_region, prefetch_pages
+from .pagination import detect_pagination_next, infer_url_template
+from .pipeline import ResultPipeline
+from .profiler import CrawlProfiler, peak_rss_mb
+from .state import CrawlCheckpoint, FingerprintStore, item_fingerprint
+from .table import extract_table
+
+def follow_details(rows, detail_config, http_get, executor, referer, request_profile, keywords=None):
+    """
+    详情页跟进：对每行的链接并发抓取详情页，按 detail_config["fields"] 提取后合并进该行。
+    返回 (成功数, 失败数)；失败的行记录“详情错误”，不影响列表数据
+    """
+    link_field = detail_config.get('link_field', '链接')
+    fields = detail_config.get('fields', {})
+    html_fields = detail_config.get('html_fields') or [f for f in fields if '正文' in f or '内容' in f]
+
+    def fetch(row):
+        url = str(row.get(link_field) or '')
+        if not url.startswith(('http://', 'https://')):
+            return row, None
+        try:
+            response = http_get(url, headers=request_profile.headers(referer), timeout=request_profile.timeout)
+            response.raise_for_status()
+            if response.encoding == 'ISO-8859-1':
+                response.encoding = detect_encoding(response.content, url)
+            return row, extract_detail(response.text, url, fields, html_fields, keywords)
+        except Exception as e:
+            return row, e
+
+    fetched, failed = 0, 0
+    for row, detail in executor.map(fetch, rows):
+        if detail is None:
+            continue
+        if isinstance(detail, Exception):
+            failed += 1
+            row['详情错误'] = str(detail)
+            print(f'[Detail] Failed {row.get(link_field)}: {detail}', file=sys.stderr)
+            continue
+        fetched += 1
+        for key, value in detail.items():
+            # 详情页取不到值时保留列表页已有的值
+            if value or key not in row:
+                row[key] = value
+    return fetched, failed
+
+def crawl(source, selectors, base_url=None, pagination_config=None, options=None, sink=None):
+    """
+    根据选择器抓取网页数据（支持多页抓取）
+    :param source: URL 或 本地文件路径
+    :param selectors: 选择器配置 {"container": str, "fields": {字段名: 选择器}}；
+        表格模式 {"mode": "table", "table": 表格选择器(可选，默认行数最多的表格),
+        "fields": {字段名: 表头文本 | 列号}(可选，默认按表头全部输出)}，见 table.extract_table；
+        JSON 接口 "api": {"url": "...?page={page}", "items": "data.list", "page_start": 1}，
+        此时 fields 的值为条目内的键路径（如 "title"、"info.pubDate"），留空按字段类别匹配常见键
+    :param base_url: 用于解析相对链接的基础 URL (如果 source 是文件)
+    :param pagination_config: 分页配置 {"enabled": bool, "next_selector": str, "max_pages": int}
+        可选 url_template: "list_{page}.html" 或 "auto"（由前两个下一页链接推断），
+        template_start: 第 2 页对应的页码（默认 2），concurrency: 模板分页并发预取数（默认 4）；
+        模板分页遇到 404 或空页即停止
+    :param options: 运行选项
+        incremental: bool | {"source_key": str} 增量模式，只返回未见过的条目，
+                     整页都是旧条目时停止翻页，首页使用 ETag/Last-Modified 条件请求
+        cache: bool | {"ttl": 秒, "max_size_mb": int, "dir": str} 磁盘 HTTP 缓存，
+               调试选择器时重复运行不再访问源站
+        detail: {"fields": {字段名: 选择器}, "link_field": "链接", "html_fields": [字段名], "concurrency": 8}
+                跟进每行链接抓取详情页（正文、附件、发布单位等），结果合并进列表行
+        attachments: bool | {"dir": str, "concurrency": 4, "max_size_mb": 200}
+                下载附件（详情页附件字段、以及直接指向 pdf/doc/xls 等的链接）到本地，
+                流式写盘、断点续传、按内容哈希去重，元数据合并进结果行
+        scheduler: bool | {"rps": 4, "concurrency": 4, "retries": 3, "backoff_base": 1.0, "backoff_max": 60}
+                按域名限速限并发，429/5xx 指数退避重试并遵守 Retry-After，默认开启；
+                翻页中途请求最终失败时保留已抓取的页，结果标记 partial
+        checkpoint: {"job_id": str, "resume": bool} 每页完成后记录进度；resume 为 true 时
+                    从上次最后完成的页之后继续，之前的条目一并返回；任务成功后清除断点
+        dedupe: bool | {"key_fields": [字段名]} 跨页去重，默认开启，按 标题+链接 去重
+        engine_profile: "basic" | "browser" 引擎配置（见 config.ENGINE_PROFILES），下列各项可单独覆盖：
+        headers: 请求头配置名或请求头字典；timeout: 请求超时秒数；
+        field_keywords: 字段关键词表名或字典；row_filter: "title_or_link" | "any_field"（表格模式默认 any_field）
+        feed: true | {"url": str, "type": "feed" | "json_feed"} 结构化来源：true 时在首页查找
+              <link rel="alternate" type="application/rss+xml"> 等订阅地址，找到则改为解析订阅；
+              指定 url 时直接解析该订阅，不抓 HTML。字段映射同 api
+        sink: {"type": "csv" | "sqlite" | "parquet", "path": str, ...} 仅命令行入口使用，
+              结果按批写入文件而不经 stdout，见 sinks.open_sink
+        profile: bool 在结果中附加 profile：每页 fetch/encoding_detect/decode/parse/
+                 container_select/extract/pagination 耗时、下载字节数、字段兜底次数及页末常驻内存
+        max_resident_pages: 模板分页预取时同时驻留内存的页数上限（默认 4）
+        max_body_mb: 单个页面解压后正文上限（默认 50），超出即中止读取
+        early_stop: bool 列表区域（按完整容器选择器匹配到的第一个容器的上一级，如 "div.main ul.list li"
+                    的 ul.list）闭合后停止读取剩余正文，截断后页面里没有条目时完整重抓；
+                    仅在不依赖页内下一页链接翻页、未开启缓存且不是结构化来源时生效
+    :param sink: 可选回调 sink(rows)，每页完成后调用；提供时结果不在内存中累积，返回的 data 为空
+    """
+    profiler = CrawlProfiler(bool(options and options.get('profile')))
+    detail_executor = None
+    downloader = None
+    checkpoint = None
+    try:
+        html_content = ""
+        actual_url = base_url if base_url else source
+        all_results = []
+        total_count = 0
+        current_url = source
+        page_count = 0
+        max_pages = pagination_config.get('max_pages', 1) if pagination_config else 1
+        pagination_enabled = pagination_config.get('enabled', False) if pagination_config else False
+        options = options or {}
+
+        engine_profile = ENGINE_PROFILES[options.get('engine_profile', 'basic')]
+        request_profile = RequestProfile(
+            options.get('headers', engine_profile['headers']),
+            options.get('timeout', engine_profile['timeout'])
+        )
+        keywords = resolve_field_keywords(options.get('field_keywords', engine_profile['field_keywords']))
+
+        table_mode = selectors.get('mode') == 'table' or bool(selectors.get('table'))
+        dedupe_config = options.get('dedupe', True)
+        pipeline = ResultPipeline(
+            dedupe=bool(dedupe_config),
+            key_fields=dedupe_config.get('key_fields') if isinstance(dedupe_config, dict) else None,
+            keywords=keywords,
+            # 数据表格通常没有标题 / 链接列，未显式指定时按任意字段有值保留
+            row_filter=options.get('row_filter', 'any_field' if table_mode else engine_profile['row_filter'])
+        )
+
+        # 增量模式：按来源 + 容器选择器区分指纹库
+        store = None
+        incremental_stats = {"skipped": 0, "stopped_early": False, "not_modified": False}
+        if options.get('incremental'):
+            incremental_config = options['incremental'] if isinstance(options['incremental'], dict) else {}
+            source_key = incremental_config.get('source_key') or f"{actual_url}|{selectors.get('container', '')}"
+            store = FingerprintStore(source_key)
+
+        # 正文流式读取并限制大小；early_stop 时列表区域闭合即停止读取。
+        # 依赖页面中的下一页链接翻页、开启缓存（不能缓存截断的正文）或结构化来源时不提前停止
+        limiter = BodyLimiter(int(float(options.get('max_body_mb', 50)) * 1024 * 1024))
+        region = None
+        static_template = pagination_enabled and pagination_config.get('url_template') not in (None, 'auto')
+        structured_source = selectors.get('api') or options.get('feed')
+        if (options.get('early_stop') and not options.get('cache') and not structured_source
+                and (not pagination_enabled or static_template)):
+            if table_mode:
+                region = container_region(f"{selectors.get('table') or 'table'} tr")
+            else:
+                region = container_region(selectors.get('container'))
+            if region is None:
+                print('[Engine] early_stop ignored: list region cannot be inferred from selector', file=sys.stderr)
+
+        scheduler = None
+        scheduler_config = options.get('scheduler', True)
+        base_get = limiter.wrap(requests.get, region)
+        if scheduler_config:
+            scheduler_config = scheduler_config if isinstance(scheduler_config, dict) else {}
+            scheduler = PolitenessScheduler(**scheduler_config)
+            base_get = scheduler.wrap(base_get)
+        # 提前停止后页面里没有找到条目时，用完整读取的请求重抓本页
+        full_get = None
+        if region is not None:
+            full_get = limiter.wrap(requests.get)
+            full_get = scheduler.wrap(full_get) if scheduler is not None else full_get
+
+        # 缓存命中不经过调度器，只有真正访问源站的请求才限速
+        cache = None
+        if options.get('cache'):
+            cache_config = options['cache'] if isinstance(options['cache'], dict) else {}
+            cache = HttpCache(cache_config.get('dir'), cache_config.get('ttl', 3600), cache_config.get('max_size_mb', 200), base_get)
+        http_get = cache.get if cache is not None else base_get
+        fetch_error = None
+
+        downloader = None
+        if options.get('attachments'):
+            attachment_config = options['attachments'] if isinstance(options['attachments'], dict) else {}
+            downloader = AttachmentDownloader(
+                attachment_config.get('dir'),
+                max(1, int(attachment_config.get('concurrency', 4))),
+                attachment_config.get('max_size_mb', 200),
+                scheduler,
+                request_profile
+            )
+
+        # 详情页跟进：整个任务共用一个线程池和连接池
+        detail_config = options.get('detail')
+        detail_stats = {"fetched": 0, "failed": 0}
+        if detail_config:
+            detail_concurrency = max(1, int(detail_config.get('concurrency', 8)))
+            detail_executor = ThreadPoolExecutor(max_workers=detail_concurrency)
+            if cache is not None:
+                detail_get = cache.get
+            else:
+                detail_session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=detail_concurrency, pool_maxsize=detail_concurrency)
+                detail_session.mount('http://', adapter)
+                detail_session.mount('https://', adapter)
+                detail_get = limiter.wrap(detail_session.get)
+                detail_get = scheduler.wrap(detail_get) if scheduler is not None else detail_get
+
+        # URL 模板分页：配置 url_template（含 {page}）或 "auto"（由前两个下一页链接推断）
+        url_template = None
+        template_start = (pagination_config or {}).get('template_start', 2)
+        auto_template = False
+        next_links = []
+        prefetched = {}
+        concurrency = max(1, int((pagination_config or {}).get('concurrency', 4)))
+        # 每页只保留提取出的纯值；解析树在下一页开始前 decompose，预取窗口限制驻留页数
+        prefetch_window = min(concurrency, max(1, int(options.get('max_resident_pages', 4))))
+        soup = None
+        if pagination_enabled and pagination_config.get('url_template'):
+            if pagination_config['url_template'] == 'auto':
+                auto_template = True
+            else:
+                url_template = pagination_config['url_template']
+
+        def template_page_url(page_number):
+            """第 page_number 页（第 1 页为入口页）的模板 URL，相对模板按入口页地址解析"""
+            return urljoin(actual_url, url_template.format(page=template_start + page_number - 2))
+
+        # 结构化来源：JSON 接口（支持 {page} 分页）或 RSS/Atom/JSON Feed，不经 BeautifulSoup
+        source_kind = None
+        items_path = None
+        feed_config = options.get('feed')
+        feed_url = None
+        if selectors.get('api'):
+            api_config = selectors['api']
+            source_kind, items_path = 'api', api_config.get('items')
+            page_start = int(api_config.get('page_start', 1))
+            current_url = api_config['url'].format(page=page_start)
+            if '{page}' in api_config['url']:
+                url_template, template_start = api_config['url'], page_start + 1
+                pagination_enabled = True
+                max_pages = int(api_config.get('max_pages', max_pages if pagination_config else 10))
+        elif isinstance(feed_config, dict) and feed_config.get('url'):
+            source_kind = feed_config.get('type', 'feed')
+            current_url = feed_url = feed_config['url']
+            pagination_enabled = False
+
+        checkpoint = None
+        if options.get('checkpoint'):
+            checkpoint_config = options['checkpoint'] if isinstance(options['checkpoint'], dict) else {}
+            job_id = checkpoint_config.get('job_id') or hashlib.sha1(
+                f"{actual_url}|{selectors.get('container', '')}".encode('utf-8')).hexdigest()
+            checkpoint = CrawlCheckpoint(job_id)
+            state, restored = checkpoint.load() if checkpoint_config.get('resume') else (None, [])
+            if state:
+                print(f'[Checkpoint] Resume job {job_id} after page {state["page_count"]}: {state["next_url"]}', file=sys.stderr)
+                current_url = state['next_url']
+                page_count = state['page_count']
+                url_template = state.get('url_template') or url_template
+                template_start = state.get('template_start', template_start)
+                pipeline.remember(restored)
+                total_count += len(restored)
+                if sink is not None:
+                    sink(restored)
+                else:
+                    all_results.extend(restored)
+            else:
+                checkpoint.clear()
+
+        while True:
+            if soup is not None:
+                # BeautifulSoup 树内部互相引用，不拆开要等循环 GC 才能回收
+                soup.decompose()
+                soup = None
+            # 上一页（HTML、订阅或 JSON 接口）处理结束
+            profiler.end_page()
+            page_count += 1
+            profiler.start_page(current_url)
+
+            # 获取当前页的 HTML
+            truncated = False
+            if os.path.exists(current_url) and os.path.isfile(current_url):
+                # 从本地文件读取
+                with profiler.phase('read'):
+                    with open(current_url, 'r', encoding='utf-8') as f:
+                        html_content = f.read()
+                profiler.set('body_bytes', os.path.getsize(current_url))
+            else:
+                # 直接请求 URL
+                headers = request_profile.headers(actual_url)
+                if store is not None and page_count == 1:
+                    headers.update(store.conditional_headers())
+
+                # 模板分页：按批并发预取后续若干页
+                if url_template and page_count > 1 and current_url not in prefetched:
+                    wave = [template_page_url(n) for n in range(page_count, min(page_count + prefetch_window, max_pages + 1))]
+                    prefetched.update(prefetch_pages(wave, http_get, actual_url, concurrency, request_profile))
+
+                try:
+                    if current_url in prefetched:
+                        response, fetch_ms = prefetched.pop(current_url)
+                        if isinstance(response, Exception):
+                            raise response
+                        profiler.add('fetch', fetch_ms)
+                    else:
+                        with profiler.phase('fetch'):
+                            response = http_get(current_url, headers=headers, timeout=request_profile.timeout)
+
+                    # 模板生成的页码越界时通常返回 404，视为分页结束
+                    if url_template and page_count > 1 and response.status_code == 404:
+                        print(f'[Pagination] Page {page_count} returned 404, stop: {current_url}', file=sys.stderr)
+                        page_count -= 1
+                        break
+                    response.raise_for_status()
+                except requests.RequestException as e:
+                    if page_count == 1:
+                        raise
+                    # 重试后仍失败：保留前面已抓取的页，作为部分结果返回
+                    print(f'[Engine] Page {page_count} failed after retries, keep partial results: {e}', file=sys.stderr)
+                    fetch_error = f'page {page_count} ({current_url}): {e}'
+                    page_count -= 1
+                    break
+                profiler.set('body_bytes', len(response.content))
+                truncated = getattr(response, 'truncated', False)
+
+                if store is not None and page_count == 1:
+                    if response.status_code == 304:
+                        print(f'[Incremental] Not modified since last run: {current_url}', file=sys.stderr)
+                        incremental_stats['not_modified'] = True
+                        break
+                    store.etag = response.headers.get('ETag') or store.etag
+                    store.last_modified = response.headers.get('Last-Modified') or store.last_modified
+
+                if source_kind:
+                    # 结构化来源直接解析字节流，编码由 XML 声明 / JSON 规范决定
+                    html_content = response.content
+                else:
+                    if response.encoding == 'ISO-8859-1':
+                        with profiler.phase('encoding_detect'):
+                            response.encoding = detect_encoding(response.content, current_url)
+                    with profiler.phase('decode'):
+                        html_content = response.text
+
+            container_selector = selectors.get('container')
+            fields = selectors.get('fields', {})
+            structured_rows = None
+
+            if source_kind:
+                with profiler.phase('parse'):
+                    content = html_content.encode('utf-8') if isinstance(html_content, str) else html_content
+                    structured_rows = parse_structured(source_kind, content, fields, actual_url, keywords, items_path)
+                html_head = ''
+            else:
+                with profiler.phase('parse'):
+                    soup = BeautifulSoup(html_content, 'html.parser')
+                html_head = html_content[:500]
+
+                if feed_config and page_count == 1:
+                    feed_kind, feed_url = discover_feed(soup, actual_url)
+                    if feed_url:
+                        print(f'[Engine] Found {feed_kind} feed, parse it instead of HTML: {feed_url}', file=sys.stderr)
+                        with profiler.phase('feed'):
+                            feed_response = http_get(feed_url, headers=request_profile.headers(actual_url), timeout=request_profile.timeout)
+                            feed_response.raise_for_status()
+                            structured_rows = parse_structured(feed_kind, feed_response.content, fields, feed_url, keywords)
+                        source_kind = feed_kind
+                        # 订阅即完整的最新列表，不再翻页
+                        pagination_enabled = False
+            html_content = response = None
+
+            # 提取当前页数据
+            if structured_rows is not None or container_selector or table_mode:
+                if structured_rows is not None:
+                    page_results = structured_rows
+                    print(f'[Engine] Found {len(page_results)} {source_kind} items', file=sys.stderr)
+                    found = len(page_results)
+                else:
+                    refetch_failed = False
+                    while True:
+                        if table_mode:
+                            # 表格模式：一次遍历表格行，按表头映射字段
+                            with profiler.phase('extract'):
+                                page_results = extract_table(soup, selectors.get('table'), fields, actual_url)
+                            print(f'[Engine] Found {len(page_results)} table rows', file=sys.stderr)
+                            found = len(page_results)
+                        else:
+                            print(f'[Engine] Searching for container: {container_selector}', file=sys.stderr)
+                            with profiler.phase('container_select'):
+                                containers = soup.select(container_selector)
+                            print(f'[Engine] Found {len(containers)} items', file=sys.stderr)
+                            found = len(containers)
+                        if found or not truncated:
+                            break
+                        # 截断的正文里没有条目（区域推断不符合页面结构），不提前停止重抓一次
+                        print(f'[Engine] Early stop left no items, refetch full page: {current_url}', file=sys.stderr)
+                        truncated = False
+                        soup.decompose()
+                        soup = None
+                        try:
+                            with profiler.phase('fetch'):
+                                response = full_get(current_url, headers=request_profile.headers(actual_url), timeout=request_profile.timeout)
+                                response.raise_for_status()
+                        except requests.RequestException as e:
+                            if page_count == 1:
+                                raise
+                            # 与翻页请求失败相同：保留前面已抓取的页，作为部分结果返回
+                            print(f'[Engine] Page {page_count} refetch failed, keep partial results: {e}', file=sys.stderr)
+                            fetch_error = f'page {page_count} ({current_url}): {e}'
+                            page_count -= 1
+                            refetch_failed = True
+                            break
+                        if response.encoding == 'ISO-8859-1':
+                            response.encoding = detect_encoding(response.content, current_url)
+                        with profiler.phase('parse'):
+                            soup = BeautifulSoup(response.text, 'html.parser')
+                        html_head = response.text[:500]
+                        response = None
+                    if refetch_failed:
+                        break
+                profiler.set('containers', found)
+
+                if url_template and page_count > 1 and not found:
+                    print(f'[Pagination] Page {page_count} has no items, stop', file=sys.stderr)
+                    # 与 404 / 请求失败一致，空页不计入已抓取页数
+                    page_count -= 1
+                    break
+                
+                if found == 0:
+                     print(f'[Engine] HTML Start: {html_head}', file=sys.stderr)
+
+                if structured_rows is None and not table_mode:
+                    with profiler.phase('extract'):
+                        page_results = extract_items(containers, fields, actual_url, keywords, profiler)
+
+                if store is not None:
+                    new_results = []
+                    for data in page_results:
+                        fingerprint = item_fingerprint(data)
+                        if fingerprint in store:
+                            continue
+                        store.add(fingerprint)
+                        new_results.append(data)
+                    incremental_stats['skipped'] += len(page_results) - len(new_results)
+
+                    # 新通知只出现在前面的页，整页都是旧条目说明后续页无需再抓
+                    if page_results and not new_results:
+                        print(f'[Incremental] Page {page_count} has no new items, stop paginating', file=sys.stderr)
+                        incremental_stats['stopped_early'] = True
+                        break
+                    page_results = new_results
+
+                page_results = pipeline.process(page_results)
+                if detail_config and page_results:
+                    with profiler.phase('detail'):
+                        fetched, failed = follow_details(
+                            page_results, detail_config, detail_get, detail_executor, actual_url, request_profile, keywords)
+                    detail_stats['fetched'] += fetched
+                    detail_stats['failed'] += failed
+                if downloader is not None and page_results:
+                    with profiler.phase('attachments'):
+                        downloader.download_rows(page_results, actual_url)
+                total_count += len(page_results)
+                if checkpoint is not None:
+                    checkpoint.append_items(page_results)
+                if sink is not None:
+                    sink(page_results)
+                else:
+                    all_results.extend(page_results)
+
+            # 检查是否需要继续抓取下一页
+            if not pagination_enabled or page_count >= max_pages:
+                break
+
+            # 检测下一页链接
+            next_selector, next_url = None, None
+
+            with profiler.phase('pagination'):
+                if url_template:
+                    next_url = template_page_url(page_count + 1)
+                elif pagination_config and pagination_config.get('next_selector'):
+                    # 使用配置的选择器
+                    next_selector = pagination_config['next_selector']
+                    next_elem = soup.select_one(next_selector)
+                    if next_elem and next_elem.get('href'):
+                        next_url = urljoin(actual_url, next_elem['href'])
+                else:
+                    # 自动检测
+                    next_selector, next_url = detect_pagination_next(soup, actual_url)
+
+            # 如果没有下一页或URL重复，则停止
+            if not next_url or next_url == current_url:
+                break
+
+            if auto_template and not url_template:
+                next_links.append(next_url)
+                if len(next_links) == 2:
+                    url_template, first_number = infer_url_template(*next_links)
+                    if url_template:
+                        # next_links[0] 是第 2 页
+                        template_start = first_number
+                        print(f'[Pagination] Inferred URL template: {url_template}', file=sys.stderr)
+                    else:
+                        auto_template = False
+
+            if checkpoint is not None:
+                checkpoint.save(next_url=next_url, page_count=page_count,
+                                url_template=url_template, template_start=template_start)
+
+            print(f'[Pagination] Crawling page {page_count + 1}: {next_url}', file=sys.stderr)
+            current_url = next_url
+
+        if soup is not None:
+            soup.decompose()
+            soup = None
+        profiler.end_page()
+
+        result = {
+            "success": True,
+            "data": all_results,
+            "count": total_count,
+            "duplicates_removed": pipeline.duplicates,
+            "pages_crawled": page_count,
+            "peak_rss_mb": peak_rss_mb()
+        }
+        if source_kind:
+            result["source_type"] = source_kind
+            if feed_url:
+                result["feed_url"] = feed_url
+        if store is not None:
+            store.save()
+            result["incremental"] = incremental_stats
+        if fetch_error:
+            result["partial"] = True
+            result["error"] = fetch_error
+        if checkpoint is not None:
+            if fetch_error:
+                # 部分结果：保留断点，之后可 resume 补抓剩余页
+                result["checkpoint"] = checkpoint.state_path
+            else:
+                checkpoint.clear()
+        result["transfer"] = limiter.stats
+        if scheduler is not None:
+            result["scheduler"] = scheduler.stats
+        if cache is not None:
+            result["cache"] = cache.stats
+        if detail_config:
+            result["detail"] = detail_stats
+        if downloader is not None:
+            result["attachments"] = downloader.stats
+        if profiler.enabled:
+            result["profile"] = profiler.report()
+        return result
+
+    except Exception as e:
+        import traceback
+        result = {
+            "success": False,
+            "error": str(e),
+            "trace": traceback.format_exc()
+        }
+        if checkpoint is not None and os.path.exists(checkpoint.state_path):
+            result["checkpoint"] = checkpoint.state_path
+            result["resumable"] = True
+        if profiler.enabled:
+            result["profile"] = profiler.report()
+        return result
+    finally:
+        if detail_executor is not None:
+            detail_executor.shutdown()
+        if downloader is not None:
+            downloader.close()
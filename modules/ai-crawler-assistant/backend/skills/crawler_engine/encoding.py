@@ -0,0 +1,117 @@
+import codecs
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+from urllib.parse import urlparse
+
+from .config import get_state_dir
+
+# 编码探测：BOM -> <meta charset> -> 站点记忆 -> 严格解码试探 -> 有界统计检测
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.I)
+
+META_SCAN_BYTES = 4096
+
+STATISTICAL_SCAN_BYTES = 64 * 1024
+
+_host_encodings = None
+# 详情页线程池、全站抓取的工作线程会并发读写站点记忆
+_host_encodings_lock = threading.Lock()
+
+def _canonical_encoding(name):
+    """统一编码名；GB2312/GBK 页面常混入扩展字符，按超集 GB18030 解码"""
+    try:
+        name = codecs.lookup(name).name
+    except (LookupError, TypeError):
+        return None
+    if name in ('gb2312', 'gbk'):
+        return 'gb18030'
+    return name
+
+def _host_encoding_memo():
+    global _host_encodings
+    with _host_encodings_lock:
+        if _host_encodings is None:
+            memo = {}
+            path = os.path.join(get_state_dir(), 'host_encodings.json')
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        memo = json.load(f)
+                except Exception:
+                    pass
+            _host_encodings = memo
+        return _host_encodings
+
+def _remember_host_encoding(host, encoding):
+    memo = _host_encoding_memo()
+    if not host or memo.get(host) == encoding:
+        return
+    with _host_encodings_lock:
+        memo[host] = encoding
+        snapshot = dict(memo)
+        # 每次写入使用独立的临时文件，写完整后再原子替换
+        state_dir = get_state_dir()
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=state_dir, prefix='host_encodings.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(snapshot, f)
+                os.replace(tmp_path, os.path.join(state_dir, 'host_encodings.json'))
+            except BaseException:
+                os.remove(tmp_path)
+                raise
+        except OSError as e:
+            print(f'[Encoding] Failed to persist host encoding: {e}', file=sys.stderr)
+
+def _decodes_cleanly(content, encoding):
+    try:
+        content.decode(encoding)
+        return True
+    except (UnicodeDecodeError, LookupError):
+        return False
+
+def detect_encoding(content, url=None):
+    """
+    响应头未声明编码时的分级编码探测，替代对全文做统计检测的 apparent_encoding。
+    检测结果按站点记忆，同站后续页面直接复用。
+    """
+    host = urlparse(url).netloc if url else ''
+
+    for bom, encoding in BOMS:
+        if content.startswith(bom):
+            return encoding
+
+    match = META_CHARSET_RE.search(content[:META_SCAN_BYTES])
+    if match:
+        encoding = _canonical_encoding(match.group(1).decode('ascii', 'ignore'))
+        if encoding:
+            _remember_host_encoding(host, encoding)
+            return encoding
+
+    remembered = _host_encoding_memo().get(host)
+    if remembered and _decodes_cleanly(content, remembered):
+        return remembered
+
+    # 严格解码在 C 层完成，比统计检测快得多；UTF-8 误判率极低，优先试探
+    for encoding in ('utf-8', 'gb18030'):
+        if _decodes_cleanly(content, encoding):
+            _remember_host_encoding(host, encoding)
+            return encoding
+
+    # 最后兜底：只对前缀做统计检测
+    from requests.compat import chardet
+    guess = chardet.detect(content[:STATISTICAL_SCAN_BYTES]).get('encoding') if chardet else None
+    encoding = _canonical_encoding(guess) or 'utf-8'
+    _remember_host_encoding(host, encoding)
+    return encoding
@@ -0,0 +1,139 @@
+import os
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+from .config import ENGINE_PROFILES, RequestProfile, resolve_field_keywords
+from .encoding import detect_encoding
+from .extract import extract_items
+from .fetch import BodyLimiter, HttpCache
+from .pipeline import is_valid_row
+from .profiler import CrawlProfiler
+from .table import extract_table
+
+def load_page(source, http_get, request_profile, referer=None):
+    """
+    读取单个页面：本地文件或 URL，返回 (html, 字节数)
+    """
+    if os.path.exists(source) and os.path.isfile(source):
+        with open(source, 'r', encoding='utf-8') as f:
+            return f.read(), os.path.getsize(source)
+    response = http_get(source, headers=request_profile.headers(referer or source), timeout=request_profile.timeout)
+    response.raise_for_status()
+    if response.encoding == 'ISO-8859-1':
+        response.encoding = detect_encoding(response.content, source)
+    return response.text, len(response.content)
+
+def evaluate_selectors(source, candidates, base_url=None, options=None):
+    """
+    批量评估选择器：页面只抓取、解析一次，在同一棵树上依次评估多组候选选择器，
+    供模板编辑器调试选择器时使用。
+    :param source: URL 或 本地文件路径
+    :param candidates: [{"container": str, "fields": {字段名: 选择器}}, ...]，
+        也可以是表格模式 {"mode": "table", "table": str, "fields": {字段名: 表头}}
+    :param base_url: 用于解析相对链接的基础 URL (如果 source 是文件)
+    :param options: engine_profile / headers / timeout / field_keywords / row_filter 同 crawl；
+        cache、max_body_mb: 同 crawl；samples: 每组返回的样例行数（默认 5）
+    :return: 每组候选的容器匹配数、有效行数、各字段命中 / 兜底 / 空值数、样例值和耗时
+    """
+    options = options or {}
+    actual_url = base_url if base_url else source
+    try:
+        engine_profile = ENGINE_PROFILES[options.get('engine_profile', 'basic')]
+        request_profile = RequestProfile(
+            options.get('headers', engine_profile['headers']),
+            options.get('timeout', engine_profile['timeout'])
+        )
+        keywords = resolve_field_keywords(options.get('field_keywords', engine_profile['field_keywords']))
+        row_filter = options.get('row_filter')
+        sample_size = int(options.get('samples', 5))
+
+        http_get = BodyLimiter(int(float(options.get('max_body_mb', 50)) * 1024 * 1024)).wrap(requests.get)
+        cache = None
+        if options.get('cache'):
+            cache_config = options['cache'] if isinstance(options['cache'], dict) else {}
+            cache = HttpCache(cache_config.get('dir'), cache_config.get('ttl', 3600), cache_config.get('max_size_mb', 200), http_get)
+            http_get = cache.get
+
+        started = time.perf_counter()
+        html_content, size = load_page(source, http_get, request_profile, actual_url)
+        fetch_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        soup = BeautifulSoup(html_content, 'html.parser')
+        parse_ms = (time.perf_counter() - started) * 1000
+
+        # 多组候选常共用同一个容器选择器，匹配结果复用
+        container_cache = {}
+        results = []
+        for index, candidate in enumerate(candidates):
+            container_selector = candidate.get('container')
+            fields = candidate.get('fields', {})
+            evaluation = {"index": index, "container": container_selector or candidate.get('table')}
+            try:
+                profiler = CrawlProfiler(True)
+                profiler.start_page(actual_url)
+                if candidate.get('mode') == 'table' or candidate.get('table'):
+                    # 表格模式：字段为表头映射，没有选择器命中 / 兜底之分；行过滤同 crawl 默认 any_field
+                    default_filter = 'any_field'
+                    select_ms = 0.0
+                    started = time.perf_counter()
+                    rows = extract_table(soup, candidate.get('table'), fields, actual_url)
+                    extract_ms = (time.perf_counter() - started) * 1000
+                    containers = rows
+                    fields = fields or {name: name for name in (rows[0] if rows else {})}
+                else:
+                    default_filter = engine_profile['row_filter']
+                    started = time.perf_counter()
+                    if container_selector not in container_cache:
+                        container_cache[container_selector] = soup.select(container_selector) if container_selector else [soup]
+                    containers = container_cache[container_selector]
+                    select_ms = (time.perf_counter() - started) * 1000
+
+                    started = time.perf_counter()
+                    rows = extract_items(containers, fields, actual_url, keywords, profiler)
+                    extract_ms = (time.perf_counter() - started) * 1000
+
+                field_stats = {}
+                for field_name in fields:
+                    values = [row[field_name] for row in rows if row.get(field_name)]
+                    stats = profiler.fields.get(field_name, {"calls": len(values), "fallbacks": 0})
+                    field_stats[field_name] = {
+                        "selector": fields[field_name],
+                        "matched": stats['calls'] - stats['fallbacks'],
+                        "fallbacks": stats['fallbacks'],
+                        "empty": len(rows) - len(values),
+                        "samples": values[:sample_size]
+                    }
+
+                evaluation.update({
+                    "matches": len(containers),
+                    "valid_rows": sum(1 for row in rows if is_valid_row(row, row_filter or default_filter, keywords)),
+                    "fields": field_stats,
+                    "samples": rows[:sample_size],
+                    "timings_ms": {"container_select": round(select_ms, 3), "extract": round(extract_ms, 3)}
+                })
+            except Exception as e:
+                # 单组选择器语法错误等不影响其他候选
+                evaluation["error"] = str(e)
+            results.append(evaluation)
+
+        result = {
+            "success": True,
+            "url": actual_url,
+            "bytes": size,
+            "timings_ms": {"fetch": round(fetch_ms, 3), "parse": round(parse_ms, 3)},
+            "candidates": results
+        }
+        if cache is not None:
+            result["cache"] = cache.stats
+        return result
+
+    except Exception as e:
+        import traceback
+        return {
+            "success": False,
+            "error": str(e),
+            "trace": traceback.format_exc()
+        }
@@ -0,0 +1,348 @@
+import re
+import time
+from html import escape as html_escape
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, NavigableString
+
+from .config import field_matches
+
+def normalize_date(date_str):
+    """
+    将各种日期格式统一转换为 YYYY-MM-DD 格式
+    """
+    if not date_str:
+        return ""
+    
+    date_str = date_str.strip()
+    
+    # 尝试各种日期格式
+    patterns = [
+        (r'(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})', '%Y-%m-%d'),  # 2025-01-09, 2025.01.09, 2025/01/09
+        (r'(\d{4})年(\d{1,2})月(\d{1,2})日', '%Y-%m-%d'),      # 2025年01月09日
+        (r'(\d{4})\.(\d{1,2})\.(\d{1,2})', '%Y-%m-%d'),       # 2025.01.09
+        (r'(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})', '%d-%m-%Y'), # 09-01-2025
+    ]
+    
+    for pattern, fmt in patterns:
+        match = re.search(pattern, date_str)
+        if match:
+            try:
+                if fmt == '%Y-%m-%d':
+                    year, month, day = match.groups()
+                    return f"{year}-{int(month):02d}-{int(day):02d}"
+                elif fmt == '%d-%m-%Y':
+                    day, month, year = match.groups()
+                    return f"{year}-{int(month):02d}-{int(day):02d}"
+            except:
+                pass
+    
+    # 如果无法解析，返回原始字符串
+    return date_str
+
+# 单遍清理：跳过的标签、块级标签（纯文本换行）、空元素
+CLEAN_SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'iframe'}
+
+CLEAN_BLOCK_TAGS = {
+    'p', 'div', 'br', 'li', 'tr', 'table', 'ul', 'ol', 'section', 'article',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre', 'hr', 'dd', 'dt'
+}
+
+CLEAN_VOID_TAGS = {'br', 'hr', 'img', 'input', 'meta', 'link', 'area', 'col', 'embed', 'source', 'wbr'}
+
+CLEAN_URL_ATTRS = {'href', 'src'}
+
+def _is_dropped_attr(name):
+    """样式、事件处理和埋点类属性"""
+    name = name.lower()
+    return name == 'style' or name.startswith('on') or name.startswith('data-')
+
+def clean_html(element, base_url=None):
+    """
+    单遍清理 HTML：一次遍历同时生成清理后的 HTML 和空白归一化的纯文本。
+    1. 去掉注释以及 script / style 等非正文标签
+    2. 去掉 style、on* 事件、data-* 埋点属性
+    3. href / src 相对地址按 base_url 转为绝对地址
+    4. 块级元素在纯文本中换行
+    不修改原始 soup。返回: (html, text)
+    """
+    if not element:
+        return "", ""
+
+    html_parts = []
+    text_parts = []
+    # 栈中为待处理节点；字符串类型的项是需要输出的闭合标签
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str) and not isinstance(node, NavigableString):
+            html_parts.append(node)
+            continue
+
+        if isinstance(node, NavigableString):
+            # 注释、CDATA、声明等都跳过
+            if type(node) is NavigableString:
+                html_parts.append(html_escape(node, quote=False))
+                text_parts.append(node)
+            continue
+
+        name = node.name
+        if name in CLEAN_SKIP_TAGS:
+            continue
+
+        attrs = []
+        for attr_name, value in node.attrs.items():
+            if _is_dropped_attr(attr_name):
+                continue
+            if isinstance(value, list):
+                value = ' '.join(value)
+            if attr_name in CLEAN_URL_ATTRS and base_url and value and not value.startswith(('javascript:', '#', 'data:')):
+                value = urljoin(base_url, value)
+            attrs.append(f' {attr_name}="{html_escape(value, quote=True)}"')
+        html_parts.append(f'<{name}{"".join(attrs)}>')
+
+        if name in CLEAN_BLOCK_TAGS:
+            text_parts.append('\n')
+        elif name in ('td', 'th'):
+            text_parts.append(' ')
+        if name in CLEAN_VOID_TAGS:
+            continue
+
+        stack.append(f'</{name}>')
+        stack.extend(reversed(node.contents))
+
+    # 纯文本：行内空白折叠，去掉空行
+    lines = (' '.join(line.split()) for line in ''.join(text_parts).split('\n'))
+    text = '\n'.join(line for line in lines if line)
+    return ''.join(html_parts), text
+
+def clean_html_content(element, base_url=None):
+    """
+    智能清理 HTML 内容，返回清理后的 HTML（见 clean_html）
+    """
+    return clean_html(element, base_url)[0]
+
+def extract_date_from_text(text):
+    """
+    从文本中通过正则提取日期格式 (支持多种分隔符及可选的前后缀)
+    """
+    if not text:
+        return ""
+    # 匹配常见日期模式 (优先匹配完整年份)
+    patterns = [
+        r'\d{4}[-/.]\d{1,2}[-/.]\d{1,2}',        # YYYY-MM-DD
+        r'\d{4}年\d{1,2}月\d{1,2}日',            # YYYY年MM月DD日
+        r'\[\s*\d{4}[-/.]\d{1,2}[-/.]\d{1,2}\s*\]',  # [YYYY-MM-DD]
+        r'\d{1,2}[-/.]\d{1,2}[-/.]\d{4}',        # DD-MM-YYYY
+        r'\d{1,2}月\d{1,2}日',                  # MM月DD日
+        # 新增：相对日期表达
+        r'\d{1,2}天前',                          # X天前
+        r'昨天|今天|前天',                       # 相对日期
+        r'\d{1,2}小时前',                        # X小时前
+        # 新增：英文月份
+        r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4}',
+        # 新增：纯数字紧凑格式
+        r'\d{8}',                                # YYYYMMDD
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, text)
+        if match:
+            # 清理匹配结果中的空白或括号
+            return match.group(0).strip('[] ')
+    return ""
+
+def get_field_data(element, attr=None, base_url=None, field_name=None, container=None, keywords=None):
+    """
+    提取字段数据并进行结构化清理。
+    如果 element 为空且提供了 container，则在 container 中进行启发式搜索。
+    """
+    # 启发式兜底逻辑
+    if not element and container:
+        # 1. 标题与链接兜底
+        if field_matches(field_name, 'title_link', keywords):
+            # 优先找含有 href 的链接
+            links = container.find_all('a', href=True)
+            if not links:
+                links = container.find_all('a')
+            
+            if links:
+                if '链接' in field_name:
+                    # 找到第一个非 javascript 的链接
+                    element = next((l for l in links if l.get('href') and not l.get('href').startswith('javascript:')), links[0])
+                    attr = 'href'
+                else:
+                    # 标题取文本最长的链接
+                    element = max(links, key=lambda l: len(l.get_text(strip=True)))
+            else:
+                # 连 a 标签都没有，强制取非空的文本块（且避开日期）
+                # 获取容器内的所有直属文本节点或小标签文本
+                texts = [t.strip() for t in container.find_all(string=True) if len(t.strip()) > 5]
+                # 过滤掉明显的日期和类型（通过长度和正则）
+                potential_titles = [t for t in texts if not extract_date_from_text(t) and len(t) < 100]
+                if potential_titles:
+                    return max(potential_titles, key=len)
+        
+        # 2. 日期兜底（增强版：优先搜索 span 等独立标签）
+        elif field_matches(field_name, 'date', keywords):
+            # 第一优先级：如果找到了 element，尝试从中提取日期
+            if element:
+                val = element.get_text(strip=True)
+                extracted_date = extract_date_from_text(val)
+                if extracted_date:
+                    return extracted_date
+
+            # 第二优先级：优先搜索 span 标签（日期通常在独立的 span 中）
+            spans = container.find_all('span')
+            for span in spans:
+                span_text = span.get_text(strip=True)
+                # 只关注简短文本（可能是日期）
+                if len(span_text) < 30:
+                    extracted_date = extract_date_from_text(span_text)
+                    if extracted_date:
+                        return extracted_date
+
+            # 第三优先级：搜索其他可能包含日期的标签
+            date_tags = container.find_all(['div', 'time', 'p', 'font', 'b'])
+            for tag in date_tags:
+                tag_text = tag.get_text(strip=True)
+                if len(tag_text) < 30:
+                    extracted_date = extract_date_from_text(tag_text)
+                    if extracted_date:
+                        return extracted_date
+
+            # 第四优先级：容器的完整文本
+            text = container.get_text(separator=' ', strip=True)
+            extracted_date = extract_date_from_text(text)
+            
+            # 向前后兄弟节点扩展搜索（增加搜索范围）
+            if not extracted_date:
+                # 搜索后向兄弟（扩大到 5 个）
+                for sib in list(container.next_siblings)[:5]:
+                    if sib.name:
+                        extracted_date = extract_date_from_text(sib.get_text())
+                        if extracted_date: break
+                # 搜索前向兄弟（扩大到 5 个）
+                if not extracted_date:
+                    for sib in list(container.previous_siblings)[:5]:
+                        if sib.name:
+                            extracted_date = extract_date_from_text(sib.get_text())
+                            if extracted_date: break
+
+            # 最后兜底搜父级（增强：向上搜索 2 层）
+            if not extracted_date and container.parent:
+                extracted_date = extract_date_from_text(container.parent.get_text(separator=' ', strip=True))
+
+            # 向上再搜索一层
+            if not extracted_date and container.parent and container.parent.parent:
+                extracted_date = extract_date_from_text(container.parent.parent.get_text(separator=' ', strip=True))
+
+            if extracted_date:
+                return extracted_date
+
+        # 3. 类型兜底
+        elif field_matches(field_name, 'type', keywords):
+            text = container.get_text(separator=' ', strip=True)
+            match = re.search(r'^([【\[\(].*?[】\]\)])|^([^|:：]*?)(?=\s*[|:：])', text)
+            if match:
+                type_val = (match.group(1) or match.group(2)).strip('【】[]() |:：')
+                if 2 <= len(type_val) < 15: return type_val
+            
+            keywords = ['解读', '政策', '文件', '通知', '公告', '公示', '指南', '动态', '要闻']
+            for kw in keywords:
+                if kw in text: return kw
+
+    if not element:
+        return ""
+    
+    val = ""
+    if attr:
+        val = element.get(attr, "").strip()
+        if val and attr in ['href', 'src'] and base_url:
+            return urljoin(base_url, val)
+    else:
+        val = element.get_text(separator=' ', strip=True)
+
+    # 针对日期的二次清洗
+    if field_matches(field_name, 'date', keywords):
+        if not val or len(val) > 20:
+            extracted_date = extract_date_from_text(val if val else element.get_text())
+            if extracted_date:
+                return extracted_date
+            if container and container.parent:
+                extracted_date = extract_date_from_text(container.parent.get_text(separator=' ', strip=True))
+                if extracted_date:
+                    return extracted_date
+                
+    return val
+
+def parse_selector(sel):
+    """解析选择器，支持 ::attr(name) 和 :first-of-type 兼容"""
+    attr = None
+    if not sel:
+        return sel, attr
+
+    # 处理 Scrapy 风格的属性提取 a::attr(href)
+    if '::attr(' in sel:
+        match = re.search(r'(.*?)::attr\((.*?)\)', sel)
+        if match:
+            sel = match.group(1).strip()
+            attr = match.group(2).strip()
+
+    # 处理 BS4 不支持的伪类
+    if ':first-of-type' in sel:
+        sel = sel.replace(':first-of-type', '')
+
+    return sel, attr
+
+def extract_items(containers, fields, base_url, keywords=None, profiler=None):
+    """
+    按字段选择器从每个容器元素提取一行数据；选择器未命中时走 get_field_data 的启发式兜底。
+    profiler 启用时按字段记录耗时与兜底次数
+    """
+    parsed = [(field_name, *parse_selector(selector)) for field_name, selector in fields.items()]
+    record = profiler is not None and profiler.enabled
+    rows = []
+    for item in containers:
+        data = {}
+        for field_name, sel, attr in parsed:
+            started = time.perf_counter()
+            element = None
+            try:
+                element = item.select_one(sel) if sel else item
+                data[field_name] = get_field_data(element, attr, base_url, field_name, item, keywords)
+            except:
+                data[field_name] = ""
+            if record:
+                profiler.record_field(field_name, started, not element)
+        rows.append(data)
+    return rows
+
+def extract_detail(html_content, url, fields, html_fields, keywords=None):
+    """
+    从详情页提取字段：
+    - html_fields 中的字段（正文）返回清理后的 HTML，另附“<字段名>文本”纯文本版本
+    - 名称含“附件”的字段返回全部匹配链接 [{"名称", "链接"}]
+    - 其余字段与列表页一致走 get_field_data
+    """
+    soup = BeautifulSoup(html_content, 'html.parser')
+    data = {}
+    for field_name, selector in fields.items():
+        sel, attr = parse_selector(selector)
+        try:
+            if '附件' in field_name:
+                attachments = []
+                for element in soup.select(sel):
+                    anchors = [element] if element.name == 'a' else element.find_all('a', href=True)
+                    for anchor in anchors:
+                        href = anchor.get('href', '').strip()
+                        if href and not href.startswith('javascript:'):
+                            attachments.append({"名称": anchor.get_text(strip=True), "链接": urljoin(url, href)})
+                data[field_name] = attachments
+            elif field_name in html_fields:
+                data[field_name], data[f'{field_name}文本'] = clean_html(soup.select_one(sel), url)
+            else:
+                data[field_name] = get_field_data(soup.select_one(sel), attr, url, field_name, keywords=keywords)
+        except Exception:
+            data[field_name] = ""
+    soup.decompose()
+    return data
@@ -0,0 +1,203 @@
+import codecs
+import io
+import json
+import re
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin
+
+from .config import field_matches
+from .extract import normalize_date
+
+FEED_TYPES = {
+    'application/rss+xml': 'feed',
+    'application/atom+xml': 'feed',
+    'application/feed+json': 'json_feed'
+}
+
+# 结构化条目的常见键名，字段选择器未指定或取不到值时按字段类别依次尝试
+STRUCTURED_KEYS = {
+    'title': ['title', 'name', 'subject', 'docTitle', '标题'],
+    'link': ['link', 'url', 'href', 'linkUrl', 'detailUrl', 'docUrl', '链接'],
+    'date': ['date', 'pubDate', 'publishDate', 'publishTime', 'pubTime', 'createTime', 'releaseDate',
+             'published', 'updated', 'date_published', '发布日期'],
+    'type': ['category', 'type', 'channel', 'columnName', 'tags', '类型'],
+    'summary': ['summary', 'description', 'content', 'abstract', 'content_text', '摘要']
+}
+
+SUMMARY_KEYWORDS = ('摘要', '内容', '正文', '描述', 'summary', 'description', 'content')
+
+def discover_feed(soup, base_url):
+    """
+    在页面 <head> 中查找 <link rel="alternate" type="application/rss+xml|atom+xml|feed+json">，
+    返回 (类型, 绝对地址)，没有时返回 (None, None)
+    """
+    for link in soup.find_all('link', href=True):
+        rel = [r.lower() for r in (link.get('rel') or [])]
+        feed_type = FEED_TYPES.get((link.get('type') or '').split(';')[0].strip().lower())
+        if 'alternate' in rel and feed_type:
+            return feed_type, urljoin(base_url, link['href'])
+    return None, None
+
+def _local(tag):
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+# expat 只支持 UTF-8 / UTF-16 / ISO-8859-1 / ASCII
+EXPAT_ENCODINGS = {'utf-8', 'utf-16', 'iso8859-1', 'ascii'}
+
+def _expat_compatible(content):
+    """
+    gb2312 / gbk 等多字节编码的订阅先转码为 UTF-8 并改写 XML 声明
+    """
+    match = re.match(rb'\s*<\?xml[^>]*encoding=["\']([\w.-]+)["\']', content[:200])
+    if not match:
+        return content
+    declared = match.group(1).decode('ascii').lower()
+    try:
+        name = codecs.lookup(declared).name
+    except LookupError:
+        return content
+    if name in EXPAT_ENCODINGS:
+        return content
+    if name in ('gb2312', 'gbk'):
+        name = 'gb18030'
+    text = content.decode(name, errors='replace')
+    return re.sub(r'encoding=["\'][\w.-]+["\']', 'encoding="utf-8"', text, count=1).encode('utf-8')
+
+def iter_feed_items(content):
+    """
+    流式解析 RSS 2.0 / RSS 1.0 / Atom，逐条产出
+    {"title", "link", "date", "category", "summary", "author"}；每条解析完即清理元素
+    """
+    for _, elem in ET.iterparse(io.BytesIO(_expat_compatible(content)), events=('end',)):
+        if _local(elem.tag) not in ('item', 'entry'):
+            continue
+        item = {"title": "", "link": "", "date": "", "category": "", "summary": "", "author": ""}
+        for child in elem:
+            name = _local(child.tag)
+            text = (child.text or '').strip()
+            if name == 'title':
+                item['title'] = text
+            elif name == 'link':
+                # Atom: <link rel="alternate" href="..."/>；RSS: <link>...</link>
+                href = child.get('href')
+                if href is None:
+                    item['link'] = item['link'] or text
+                elif child.get('rel', 'alternate') == 'alternate':
+                    item['link'] = href
+            elif name in ('pubDate', 'published', 'date', 'issued') or (name == 'updated' and not item['date']):
+                item['date'] = text
+            elif name == 'category' and not item['category']:
+                item['category'] = child.get('term') or text
+            elif name in ('description', 'summary', 'content', 'encoded') and not item['summary']:
+                item['summary'] = text
+            elif name in ('author', 'creator') and not item['author']:
+                author_name = next((c.text for c in child if _local(c.tag) == 'name'), None)
+                item['author'] = (author_name or text).strip()
+            elif name == 'guid' and not item['link'] and text.startswith(('http://', 'https://')):
+                item['link'] = text
+        yield item
+        elem.clear()
+
+def iter_json_items(content, items_path=None):
+    """
+    逐条产出 JSON 中 items_path（如 "data.list"、"data.0.list"，为空表示顶层）处的条目：
+    该处为数组时逐个产出元素，为对象时作为单个条目产出，为标量或不存在时不产出。
+    安装了 ijson 时流式解析；路径含数字下标或名为 item 的键（ijson 用它表示数组元素，会产生歧义）时
+    整体 json.loads 后取值，两种方式结果相同；
+    不支持键名本身含 "." 的路径
+    """
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+    items_path = items_path or ''
+    if ijson is not None and not any(key.isdigit() or key == 'item' for key in items_path.split('.')):
+        # ijson 的前缀以 .item 表示数组元素，先看目标处是数组还是对象
+        kind = next((event for prefix, event, _ in ijson.parse(io.BytesIO(content))
+                     if prefix == items_path and event != 'map_key'), None)
+        if kind == 'start_array':
+            yield from ijson.items(io.BytesIO(content), f'{items_path}.item' if items_path else 'item', use_float=True)
+        elif kind == 'start_map':
+            yield from ijson.items(io.BytesIO(content), items_path, use_float=True)
+        return
+    data = json.loads(content)
+    items = get_path(data, items_path) if items_path else data
+    if isinstance(items, dict):
+        yield items
+    elif isinstance(items, list):
+        yield from items
+
+def get_path(data, path):
+    """按 "a.b.0.c" 取嵌套值，取不到返回 None"""
+    for key in str(path).split('.'):
+        if isinstance(data, list) and key.isdigit() and int(key) < len(data):
+            data = data[int(key)]
+        elif isinstance(data, dict) and key in data:
+            data = data[key]
+        else:
+            return None
+    return data
+
+def _structured_date(value):
+    """RFC 822 / ISO 8601 / 秒或毫秒时间戳统一为 YYYY-MM-DD"""
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit() and len(value) in (10, 13)):
+        timestamp = float(value)
+        if timestamp > 1e12:
+            timestamp /= 1000
+        try:
+            return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+        except (OverflowError, OSError, ValueError):
+            return str(value)
+    value = str(value).strip()
+    try:
+        return parsedate_to_datetime(value).strftime('%Y-%m-%d')
+    except (TypeError, ValueError, IndexError):
+        return normalize_date(value)
+
+def _field_kind(field_name, keywords):
+    if field_matches(field_name, 'title_link', keywords):
+        lowered = field_name.lower()
+        return 'link' if ('链接' in field_name or 'link' in lowered or 'url' in lowered) else 'title'
+    for kind in ('date', 'type'):
+        if field_matches(field_name, kind, keywords):
+            return kind
+    if any(k in field_name.lower() for k in SUMMARY_KEYWORDS):
+        return 'summary'
+    return None
+
+def map_structured_item(item, fields, base_url=None, keywords=None):
+    """
+    把 feed / JSON 条目映射为与 HTML 抓取相同的字段名：
+    字段选择器为条目内的键路径时直接取值，否则按字段类别（标题 / 链接 / 日期 / 类型 / 摘要）匹配常见键
+    """
+    data = {}
+    for field_name, spec in fields.items():
+        value = get_path(item, spec) if spec and isinstance(item, dict) else None
+        kind = _field_kind(field_name, keywords)
+        if value is None and kind:
+            value = next((item[k] for k in STRUCTURED_KEYS[kind] if isinstance(item, dict) and item.get(k)), None)
+        if value is None:
+            data[field_name] = ""
+            continue
+        if isinstance(value, list):
+            value = ' '.join(str(v.get('term', v) if isinstance(v, dict) else v) for v in value)
+        if kind == 'link' and base_url:
+            value = urljoin(base_url, str(value))
+        elif kind == 'date':
+            value = _structured_date(value)
+        data[field_name] = value if isinstance(value, (str, int, float, bool)) else json.dumps(value, ensure_ascii=False)
+    return data
+
+def parse_structured(kind, content, fields, base_url=None, keywords=None, items_path=None):
+    """
+    解析结构化来源并映射字段：kind 为 feed（RSS/Atom）、json_feed（JSON Feed）或 api（JSON 接口）
+    """
+    if kind == 'feed':
+        items = iter_feed_items(content)
+    elif kind == 'json_feed':
+        items = iter_json_items(content, items_path or 'items')
+    else:
+        items = iter_json_items(content, items_path)
+    return [map_structured_item(item, fields, base_url, keywords) for item in items]
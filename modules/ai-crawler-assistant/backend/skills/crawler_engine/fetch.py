@@ -0,0 +1,465 @@
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .config import get_state_dir
+
+class PolitenessScheduler:
+    """
+    礼貌调度：按域名限制请求速率（rps）和并发数；遇到 429/5xx 或连接错误时
+    指数退避（带随机抖动）重试，优先遵守 Retry-After，退避期间同域名的其他请求也一并推迟
+    """
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(self, rps=4, concurrency=4, retries=3, backoff_base=1.0, backoff_max=60):
+        self.interval = 1.0 / rps if rps else 0
+        self.concurrency = max(1, int(concurrency))
+        self.retries = max(0, int(retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hosts = {}
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "retries": 0}
+
+    def _host(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None:
+                state = self.hosts[host] = {
+                    "lock": threading.Lock(),
+                    "semaphore": threading.Semaphore(self.concurrency),
+                    "next_time": 0.0
+                }
+            return state
+
+    def _wait_turn(self, state):
+        with state['lock']:
+            now = time.monotonic()
+            start = max(now, state['next_time'])
+            state['next_time'] = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def _delay(self, attempt, response):
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(self.backoff_max, max(0.0, float(retry_after)))
+            except ValueError:
+                try:
+                    retry_at = parsedate_to_datetime(retry_after)
+                    return min(self.backoff_max, max(0.0, retry_at.timestamp() - time.time()))
+                except (TypeError, ValueError):
+                    pass
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def wrap(self, fetch):
+        """
+        包装与 requests.get 同签名的请求函数，返回带限速和重试的版本
+        """
+        def scheduled(url, **kwargs):
+            state = self._host(url)
+            for attempt in range(self.retries + 1):
+                self._wait_turn(state)
+                response, error = None, None
+                with state['semaphore']:
+                    self.stats['requests'] += 1
+                    try:
+                        response = fetch(url, **kwargs)
+                    except (requests.ConnectionError, requests.Timeout) as e:
+                        error = e
+
+                if response is not None and response.status_code not in self.RETRY_STATUS:
+                    return response
+                if attempt == self.retries:
+                    if error is not None:
+                        raise error
+                    return response
+
+                delay = self._delay(attempt, response)
+                reason = error if error is not None else f'HTTP {response.status_code}'
+                print(f'[Scheduler] {reason} on {url}, retry {attempt + 1}/{self.retries} in {delay:.1f}s', file=sys.stderr)
+                if response is not None:
+                    response.close()
+                # 同域名的后续请求一起让路
+                with state['lock']:
+                    state['next_time'] = max(state['next_time'], time.monotonic() + delay)
+                self.stats['retries'] += 1
+                time.sleep(delay)
+        return scheduled
+
+class ResponseTooLarge(requests.RequestException):
+    """响应正文（解压后）超过上限"""
+
+def _parse_compound(compound):
+    """简单复合选择器 tag#id.class 解析为 (tag, id, classes)，含属性 / 伪类时返回 None"""
+    match = re.fullmatch(r'([a-zA-Z][\w-]*|\*)?((?:[#.][\w-]+)*)', compound)
+    if not match or not compound:
+        return None
+    tag = match.group(1) if match.group(1) not in (None, '*') else None
+    parts = re.findall(r'([#.])([\w-]+)', match.group(2))
+    return tag, next((v for k, v in parts if k == '#'), None), {v for k, v in parts if k == '.'}
+
+def container_region(selector):
+    """
+    把容器选择器解析为复合选择器链 [(组合符, 复合选择器), ...]，组合符为 ' '（后代）或 '>'（子级），
+    首项为 None。列表区域即链中倒数第二级绑定的祖先元素（如 "div.main ul.list li" 的 ul.list）。
+    无法安全推断（单级、含逗号 / 兄弟组合符 / 属性 / 伪类）时返回 None
+    """
+    if not selector or ',' in selector:
+        return None
+    tokens = re.split(r'\s*([>+~])\s*|\s+', selector.strip())
+    chain = [(None, _parse_compound(tokens[0]))]
+    for combinator, compound in zip(tokens[1::2], tokens[2::2]):
+        if combinator in ('+', '~'):
+            return None
+        chain.append((combinator or ' ', _parse_compound(compound)))
+    if len(chain) < 2 or any(compound is None for _, compound in chain):
+        return None
+    return chain
+
+def _compound_matches(compound, element):
+    name, element_id, classes = compound
+    tag, attr_id, attr_classes = element
+    if name and name != tag:
+        return False
+    if element_id and attr_id != element_id:
+        return False
+    return classes.issubset(attr_classes)
+
+VOID_ELEMENTS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                           'link', 'meta', 'param', 'source', 'track', 'wbr'])
+
+# 可省略结束标签的元素：遇到这些开始标签时，隐式闭合边界内最近的同类元素
+IMPLIED_END = {
+    'li': (('li',), ('ul', 'ol')),
+    'dt': (('dt', 'dd'), ('dl',)),
+    'dd': (('dt', 'dd'), ('dl',)),
+    'tr': (('tr',), ('table', 'thead', 'tbody', 'tfoot')),
+    'td': (('td', 'th'), ('tr',)),
+    'th': (('td', 'th'), ('tr',)),
+    'option': (('option',), ('select',)),
+}
+
+class RegionCloseDetector(HTMLParser):
+    """
+    增量 HTML 解析：维护元素栈，按完整选择器链（含祖先）识别容器元素，
+    第一个容器所在的列表区域闭合后 closed 置为 True
+    """
+
+    def __init__(self, chain):
+        super().__init__(convert_charrefs=False)
+        self.chain = chain
+        self.stack = []
+        # 列表区域元素在栈中的位置
+        self.region = None
+        self.closed = False
+
+    def _matches(self, index, position):
+        """chain[index] 能否绑定到 stack[position]（连同其前面各级）"""
+        if not _compound_matches(self.chain[index][1], self.stack[position]):
+            return False
+        if index == 0:
+            return True
+        candidates = [position - 1] if self.chain[index][0] == '>' else range(position - 1, -1, -1)
+        return any(q >= 0 and self._matches(index - 1, q) for q in candidates)
+
+    def _find_region(self):
+        """栈顶元素匹配完整选择器时，返回倒数第二级绑定的祖先位置"""
+        top = len(self.stack) - 1
+        if not _compound_matches(self.chain[-1][1], self.stack[top]):
+            return None
+        candidates = [top - 1] if self.chain[-1][0] == '>' else range(top - 1, -1, -1)
+        return next((q for q in candidates if q >= 0 and self._matches(len(self.chain) - 2, q)), None)
+
+    def _pop_to(self, position):
+        del self.stack[position:]
+        if self.region is not None and self.region >= position:
+            self.closed = True
+
+    def _open(self, tag, attrs, void):
+        if self.closed:
+            return
+        closes, boundaries = IMPLIED_END.get(tag, ((), ()))
+        for position in range(len(self.stack) - 1, -1, -1):
+            name = self.stack[position][0]
+            if name in boundaries:
+                break
+            if name in closes:
+                self._pop_to(position)
+                break
+        attrs = dict(attrs)
+        self.stack.append((tag, attrs.get('id'), set((attrs.get('class') or '').split())))
+        if self.region is None:
+            self.region = self._find_region()
+        if void:
+            self.stack.pop()
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag, attrs, tag in VOID_ELEMENTS)
+
+    def handle_startendtag(self, tag, attrs):
+        self._open(tag, attrs, True)
+
+    def handle_endtag(self, tag):
+        if self.closed:
+            return
+        for position in range(len(self.stack) - 1, -1, -1):
+            if self.stack[position][0] == tag:
+                self._pop_to(position)
+                break
+
+class BodyLimiter:
+    """
+    流式读取响应正文：urllib3 边下载边解压（gzip / deflate，装了 brotli 时含 br），
+    解压后超过 max_bytes 立即中止；wrap 时指定列表区域（见 container_region）则用增量解析器
+    观察已读内容，区域闭合后不再读取剩余部分（页脚、脚本等）
+    """
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, max_bytes=50 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.stats = {"compressed": 0, "early_stopped": 0, "bytes_skipped": 0, "too_large": 0}
+
+    def wrap(self, fetch, region=None):
+        """包装与 requests.get 同签名的请求函数"""
+        def limited(url, **kwargs):
+            kwargs['stream'] = True
+            response = fetch(url, **kwargs)
+            declared = response.headers.get('Content-Length')
+            encoded = response.headers.get('Content-Encoding', 'identity').lower() != 'identity'
+            if encoded:
+                self.stats['compressed'] += 1
+            if declared and declared.isdigit() and not encoded and int(declared) > self.max_bytes:
+                response.close()
+                self.stats['too_large'] += 1
+                raise ResponseTooLarge(f'Response body {declared} bytes exceeds limit {self.max_bytes}: {url}')
+
+            detector = RegionCloseDetector(region) if region and response.status_code == 200 else None
+            chunks, size = [], 0
+            try:
+                for chunk in response.iter_content(self.CHUNK_SIZE):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        self.stats['too_large'] += 1
+                        raise ResponseTooLarge(f'Response body exceeds limit {self.max_bytes}: {url}')
+                    if detector is not None:
+                        # 标签和属性是 ASCII，按 latin-1 解码即可逐块喂给解析器
+                        detector.feed(chunk.decode('latin-1'))
+                        if detector.closed:
+                            self.stats['early_stopped'] += 1
+                            if declared and declared.isdigit() and not encoded:
+                                self.stats['bytes_skipped'] += max(0, int(declared) - size)
+                            response.truncated = True
+                            break
+            finally:
+                response.close()
+            response._content = b''.join(chunks)
+            response._content_consumed = True
+            return response
+        return limited
+
+class HttpCache:
+    """
+    磁盘 HTTP 缓存：按 URL + Vary 请求头取键，正文 zlib 压缩存储。
+    TTL 内直接命中不访问源站；过期后用 If-None-Match / If-Modified-Since 重新验证；
+    总大小超限时按最近访问时间（正文文件 mtime）做 LRU 淘汰。
+    """
+    # 回放响应时保留的响应头
+    KEPT_HEADERS = ['Content-Type', 'ETag', 'Last-Modified', 'Vary', 'Date']
+    # 引擎每次请求随机选择 User-Agent，计入变体键会让 Vary: User-Agent 的站点几乎总是未命中
+    UNKEYED_VARY = {'user-agent'}
+
+    def __init__(self, cache_dir=None, ttl=3600, max_size_mb=200, http_get=None):
+        self.http_get = http_get or requests.get
+        self.cache_dir = cache_dir or get_state_dir('http_cache')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0}
+
+    def _path(self, key, ext):
+        return os.path.join(self.cache_dir, f'{key}.{ext}')
+
+    def _entry_key(self, url, headers):
+        """
+        同一 URL 的不同 Vary 变体使用不同的键 <url_key>-<变体哈希>；Vary 头名单记录在 <url_key>.vary 中。
+        名单文件损坏或正被写入时返回 None，按未命中处理
+        """
+        url_key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        vary_names = []
+        vary_path = self._path(url_key, 'vary')
+        if os.path.exists(vary_path):
+            try:
+                with open(vary_path, 'r', encoding='utf-8') as f:
+                    vary_names = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f'[Cache] Unreadable vary list for {url}, treated as miss: {e}', file=sys.stderr)
+                return None
+        vary_names = [name for name in vary_names if name.lower() not in self.UNKEYED_VARY]
+        if not vary_names:
+            return url_key
+        headers = CaseInsensitiveDict(headers or {})
+        variant = '\x1f'.join(f'{name.lower()}={headers.get(name, "")}' for name in vary_names)
+        return f"{url_key}-{hashlib.sha1(variant.encode('utf-8')).hexdigest()[:16]}"
+
+    def _load(self, key):
+        if key is None:
+            return None, None
+        meta_path, body_path = self._path(key, 'json'), self._path(key, 'z')
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None, None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = zlib.decompress(f.read())
+            return meta, body
+        except Exception as e:
+            print(f'[Cache] Corrupted entry {key}, ignored: {e}', file=sys.stderr)
+            return None, None
+
+    def _replay(self, meta, body, key):
+        """把缓存条目还原成 requests.Response，调用方无需区分来源"""
+        os.utime(self._path(key, 'z'))
+        response = requests.Response()
+        response.status_code = meta.get('status', 200)
+        response.reason = 'OK'
+        response.url = meta['url']
+        response._content = body
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+    def _store(self, url, headers, response):
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        if 'no-store' in cache_control:
+            return
+
+        url_key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        vary = response.headers.get('Vary', '')
+        vary_names = [v.strip() for v in vary.split(',') if v.strip() and v.strip() != '*']
+        # 先写临时文件再替换，并发读取时不会读到半个文件
+        vary_path = self._path(url_key, 'vary')
+        with open(f'{vary_path}.{threading.get_ident()}.tmp', 'w', encoding='utf-8') as f:
+            json.dump(vary_names, f)
+        os.replace(f.name, vary_path)
+
+        key = self._entry_key(url, headers)
+        if key is None:
+            return
+        meta = {
+            "url": url,
+            "status": response.status_code,
+            "headers": {k: response.headers[k] for k in self.KEPT_HEADERS if k in response.headers},
+            "stored_at": time.time()
+        }
+        with open(self._path(key, 'z'), 'wb') as f:
+            f.write(zlib.compress(response.content, 6))
+        with open(self._path(key, 'json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.z'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name[:-2]))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        while entries and total > self.max_bytes:
+            _, size, key = entries.pop(0)
+            for ext in ('z', 'json'):
+                try:
+                    os.remove(self._path(key, ext))
+                except OSError:
+                    pass
+            total -= size
+        # 某个 URL 的所有变体都被淘汰后，它的 .vary 名单一并删除
+        live = {key.split('-', 1)[0] for _, _, key in entries}
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.vary') and name[:-5] not in live:
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def get(self, url, headers=None, timeout=None):
+        """
+        与 requests.get 同签名的带缓存请求
+        """
+        headers = dict(headers or {})
+        key = self._entry_key(url, headers)
+        meta, body = self._load(key)
+
+        if meta and time.time() - meta['stored_at'] < self.ttl:
+            self.stats['hits'] += 1
+            print(f'[Cache] HIT {url}', file=sys.stderr)
+            return self._replay(meta, body, key)
+
+        # 调用方自带条件请求头时（如增量模式）由调用方处理 304，这里不做替换
+        caller_conditional = 'If-None-Match' in headers or 'If-Modified-Since' in headers
+        if meta and not caller_conditional:
+            cached_headers = meta.get('headers', {})
+            if cached_headers.get('ETag'):
+                headers['If-None-Match'] = cached_headers['ETag']
+            if cached_headers.get('Last-Modified'):
+                headers['If-Modified-Since'] = cached_headers['Last-Modified']
+
+        response = self.http_get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and meta and not caller_conditional:
+            self.stats['revalidated'] += 1
+            print(f'[Cache] REVALIDATED {url}', file=sys.stderr)
+            meta['stored_at'] = time.time()
+            with open(self._path(key, 'json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            return self._replay(meta, body, key)
+
+        self.stats['misses'] += 1
+        if response.status_code == 200:
+            try:
+                self._store(url, headers, response)
+            except OSError as e:
+                print(f'[Cache] Store failed for {url}: {e}', file=sys.stderr)
+        return response
+
+def prefetch_pages(urls, http_get, referer, concurrency, request_profile):
+    """
+    并发预取一批页面，返回 {url: (response 或异常, 耗时毫秒)}
+    """
+    def fetch(url):
+        started = time.perf_counter()
+        try:
+            response = http_get(url, headers=request_profile.headers(referer), timeout=request_profile.timeout)
+        except Exception as e:
+            response = e
+        return url, (response, (time.perf_counter() - started) * 1000)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return dict(executor.map(fetch, urls))
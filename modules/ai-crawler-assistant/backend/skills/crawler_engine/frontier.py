@@ -0,0 +1,142 @@
+import hashlib
+import heapq
+import mmap
+import os
+import re
+import uuid
+from array import array
+from bisect import bisect_left
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .config import get_state_dir
+
+# 规范化时去掉的跟踪 / 会话 / 防缓存参数（utm_* 按前缀）
+TRACKING_PARAMS = {'spm', 'from', 'share', 'jsessionid', 'phpsessid', '_t', '_', 'timestamp'}
+
+DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
+def canonicalize_link(url, strip_params=TRACKING_PARAMS):
+    """
+    全站抓取用的 URL 规范化：协议和域名小写、去掉默认端口和锚点、
+    去掉跟踪参数并按参数名排序；非 http(s) 链接返回 None
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return None
+    netloc = parts.netloc.lower()
+    if netloc.endswith(DEFAULT_PORTS[scheme]):
+        netloc = netloc[:-len(DEFAULT_PORTS[scheme])]
+    # ;jsessionid=... 之类的路径参数
+    path = re.sub(r';jsessionid=[^/?#]*', '', parts.path, flags=re.I) or '/'
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k.lower() not in strip_params and not k.lower().startswith('utm_')]
+    return urlunsplit((scheme, netloc, path, urlencode(sorted(query)), ''))
+
+def url_fingerprint(url):
+    """URL 的 64 位指纹"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
+class VisitedSet:
+    """
+    已见 URL 集合：只保存 64 位指纹（误判率约 n²/2⁶⁵，数万到数百万 URL 可忽略）。
+    新指纹先进入内存缓冲，缓冲满后归并进有序数组（每条 8 字节，二分查找）；
+    有序数组超过 memory_limit 条且允许落盘时写入状态目录并 mmap，内存只保留缓冲
+    """
+    BUFFER_SIZE = 65536
+
+    def __init__(self, memory_limit=2000000, spill=True):
+        self.memory_limit = memory_limit
+        self.spill = spill
+        self.buffer = set()
+        self.run = array('Q')
+        self.spill_path = None
+        self._file = None
+        self._mmap = None
+
+    def __len__(self):
+        return len(self.buffer) + len(self.run)
+
+    def __contains__(self, url):
+        return self._contains(url_fingerprint(url))
+
+    def _contains(self, fingerprint):
+        if fingerprint in self.buffer:
+            return True
+        run = self.run
+        index = bisect_left(run, fingerprint)
+        return index < len(run) and run[index] == fingerprint
+
+    def add(self, url):
+        """加入集合，返回是否为新 URL"""
+        fingerprint = url_fingerprint(url)
+        if self._contains(fingerprint):
+            return False
+        self.buffer.add(fingerprint)
+        if len(self.buffer) >= self.BUFFER_SIZE:
+            self._merge()
+        return True
+
+    def _merge(self):
+        merged = heapq.merge(self.run, sorted(self.buffer))
+        self.buffer = set()
+        if not (self.spill and len(self.run) + self.BUFFER_SIZE > self.memory_limit):
+            self.run = array('Q', merged)
+            return
+
+        # 落盘：流式归并写入新文件后替换，再 mmap 为只读有序数组
+        path = os.path.join(get_state_dir('frontier'), f'visited-{uuid.uuid4().hex}.bin')
+        with open(path, 'wb') as f:
+            chunk = array('Q')
+            for fingerprint in merged:
+                chunk.append(fingerprint)
+                if len(chunk) >= self.BUFFER_SIZE:
+                    chunk.tofile(f)
+                    chunk = array('Q')
+            chunk.tofile(f)
+        self.close()
+        self.spill_path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.run = memoryview(self._mmap).cast('Q')
+
+    def close(self):
+        """释放 mmap 并删除落盘文件"""
+        if self._mmap is not None:
+            self.run.release()
+            self.run = array('Q')
+            self._mmap.close()
+            self._file.close()
+            os.remove(self.spill_path)
+            self._mmap = self._file = self.spill_path = None
+
+class UrlFrontier:
+    """
+    待抓 URL 优先队列：按 (深度, 栏目已入队数) 排序，浅层优先，
+    同一深度内各栏目（路径第一段）轮流出队，避免某个大栏目占满抓取配额
+    """
+
+    def __init__(self):
+        self.heap = []
+        self.section_counts = {}
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    @staticmethod
+    def section(url):
+        parts = urlsplit(url)
+        segment = parts.path.strip('/').split('/', 1)[0]
+        return f'{parts.netloc}/{segment}'
+
+    def push(self, url, depth):
+        section = self.section(url)
+        rank = self.section_counts.get(section, 0)
+        self.section_counts[section] = rank + 1
+        self.sequence += 1
+        heapq.heappush(self.heap, (depth, rank, self.sequence, url))
+
+    def pop(self):
+        depth, _, _, url = heapq.heappop(self.heap)
+        return url, depth
@@ -0,0 +1,162 @@
+import re
+from urllib.parse import urljoin, urlparse
+
+# 下一页候选打分规则（一次遍历所有 a 标签，取得分最高者）
+NEXT_TEXT_EXACT = {'下一页', '下页', '下一页>', '下一页>>', '下一页»', 'next', 'next page', 'next »', 'next page »', 'next page ›', '>', '>>', '»', '›'}
+
+NEXT_TEXT_KEYWORDS = ('下一页', '下页', 'next')
+
+# 关键字包含匹配的文本长度上限，避免把含 next 的长标题当成下一页（如 "Next Page »"、"下一页 (Next)" 仍可识别）
+NEXT_TEXT_MAX_LEN = 20
+
+NEXT_EXCLUDE_KEYWORDS = ('上一页', '上页', '首页', '尾页', '末页', 'prev', 'previous', 'last', 'first')
+
+PAGINATION_CONTAINER_CLASSES = {'pagination', 'pager', 'page', 'pagenav'}
+
+# 每个域名命中过的下一页策略，后续页直接复用
+_pagination_strategies = {}
+
+def _followable(anchor):
+    """href 非空且不是 javascript: / # 占位（如末页上禁用的“下一页”）"""
+    href = (anchor.get('href') or '').strip()
+    return bool(href) and not href.startswith('javascript:') and href != '#'
+
+def _score_next_candidate(anchor):
+    """
+    对单个 a 标签打分，返回 (score, strategy)；strategy 用于同站后续页快速定位
+    """
+    text = anchor.get_text(strip=True)
+    text_lower = text.lower()
+    if any(k in text_lower for k in NEXT_EXCLUDE_KEYWORDS):
+        return 0, None
+
+    score, strategy = 0, None
+    rel = anchor.get('rel') or []
+    if 'next' in [r.lower() for r in rel]:
+        score, strategy = 100, ('rel', 'next')
+
+    aria = (anchor.get('aria-label') or '').strip()
+    if aria and ('next' in aria.lower() or '下一页' in aria) and score < 80:
+        score, strategy = 80, ('aria', aria)
+
+    if text_lower in NEXT_TEXT_EXACT and score < 90:
+        score, strategy = 90, ('text', text)
+    elif any(k in text_lower for k in NEXT_TEXT_KEYWORDS) and len(text) <= NEXT_TEXT_MAX_LEN and score < 60:
+        score, strategy = 60, ('text', text)
+
+    classes = [c for c in anchor.get('class', []) if 'next' in c.lower()]
+    if classes and score < 70:
+        score, strategy = 70, ('class', f'a.{classes[0]}')
+    elif anchor.parent is not None and score < 70:
+        parent_classes = [c for c in anchor.parent.get('class', []) if 'next' in c.lower()]
+        if parent_classes:
+            score, strategy = 70, ('class', f'.{parent_classes[0]} > a')
+
+    # 位于分页容器内的候选略微加分
+    if score:
+        for ancestor in anchor.parents:
+            if ancestor.name in ('body', 'html', '[document]'):
+                break
+            if PAGINATION_CONTAINER_CLASSES.intersection(ancestor.get('class', [])):
+                score += 10
+                break
+    return score, strategy
+
+def _apply_pagination_strategy(soup, strategy):
+    """
+    用已命中的策略直接定位下一页链接，返回 (可跟随的链接或 None, 是否匹配到候选)。
+    只匹配到 javascript: / # 占位时说明下一页按钮已禁用
+    """
+    kind, value = strategy
+    if kind == 'rel':
+        anchors = soup.select('a[rel~="next"][href]')
+    elif kind == 'aria':
+        anchors = soup.find_all('a', attrs={'aria-label': value, 'href': True})
+    elif kind == 'class':
+        anchors = soup.select(f'{value}[href]')
+    elif kind == 'text':
+        anchors = (a for a in soup.find_all('a', href=True) if a.get_text(strip=True) == value)
+    else:
+        anchors = ()
+    matched = False
+    for anchor in anchors:
+        if _followable(anchor):
+            return anchor, True
+        matched = True
+    return None, matched
+
+def _strategy_selector(strategy):
+    kind, value = strategy
+    if kind == 'rel':
+        return 'a[rel~="next"]'
+    if kind == 'aria':
+        return f'a[aria-label="{value}"]'
+    if kind == 'class':
+        return value
+    return f'a:-soup-contains("{value}")'
+
+def detect_pagination_next(soup, url):
+    """
+    智能检测下一页按钮的选择器
+    一次遍历全部链接，按文本 / rel / class / aria-label 打分取最优，
+    命中的策略按域名缓存，同站后续页直接使用
+    返回: (选择器字符串, 下一页URL)
+    """
+    domain = urlparse(url).netloc
+    strategy = _pagination_strategies.get(domain)
+    if strategy:
+        anchor, matched = _apply_pagination_strategy(soup, strategy)
+        if anchor is not None:
+            return _strategy_selector(strategy), urljoin(url, anchor['href'].strip())
+        if matched:
+            return None, None
+
+    best_score, best_anchor, best_strategy = 0, None, None
+    disabled = False
+    for anchor in soup.find_all('a', href=True):
+        score, candidate_strategy = _score_next_candidate(anchor)
+        if not _followable(anchor):
+            disabled = disabled or score > 0
+        elif score > best_score:
+            best_score, best_anchor, best_strategy = score, anchor, candidate_strategy
+
+    if best_anchor is not None:
+        _pagination_strategies[domain] = best_strategy
+        return _strategy_selector(best_strategy), urljoin(url, best_anchor['href'].strip())
+    if disabled:
+        # 只有禁用的下一页按钮：已是最后一页
+        return None, None
+
+    # 尝试查找分页容器中的最后一个链接
+    pagination_containers = soup.select('.pagination, .pager, .page, .pagenav')
+    for container in pagination_containers:
+        links = [a for a in container.find_all('a', href=True) if _followable(a)]
+        if links:
+            # 返回最后一个链接
+            return f'.{container.get("class", [""])[0]} a:last-child', urljoin(url, links[-1]['href'])
+
+    return None, None
+
+def infer_url_template(first_url, second_url):
+    """
+    由连续两个下一页链接推断分页 URL 模板，
+    如 index_1.html / index_2.html -> index_{page}.html
+    返回: (模板, first_url 中的页码)，无法推断时返回 (None, None)
+    """
+    first_parts = re.split(r'(\d+)', first_url)
+    second_parts = re.split(r'(\d+)', second_url)
+    if len(first_parts) != len(second_parts):
+        return None, None
+
+    # re.split 带捕获组时，奇数下标为数字段
+    diff = [i for i, (a, b) in enumerate(zip(first_parts, second_parts)) if a != b]
+    if len(diff) != 1 or diff[0] % 2 == 0:
+        return None, None
+    index = diff[0]
+    first_number = int(first_parts[index])
+    if int(second_parts[index]) != first_number + 1:
+        return None, None
+
+    escaped = [p.replace('{', '{{').replace('}', '}}') for p in first_parts]
+    escaped[index] = '{page}'
+    return ''.join(escaped), first_number
@@ -0,0 +1,107 @@
+import hashlib
+import sys
+from urllib.parse import urlsplit, urlunsplit
+
+from .config import field_matches
+from .extract import normalize_date
+
+def title_link_fields(field_names, keywords=None):
+    """按字段关键词表（title_link 类）找出标题 / 链接字段，如 标题、链接 或 title、url"""
+    return [name for name in field_names if isinstance(name, str) and field_matches(name, 'title_link', keywords)]
+
+def is_valid_row(row, mode='title_or_link', keywords=None, key_fields=None):
+    """
+    过滤无效行：
+    - title_or_link: 标题和链接类字段（按字段关键词表识别，或直接给出 key_fields）都为空的行丢弃
+    - any_field: 只要任意字段有值即可保留
+    """
+    if mode == 'any_field':
+        return any(v for v in row.values() if v and str(v).strip())
+    if key_fields is None:
+        key_fields = title_link_fields(row, keywords)
+    return any(row.get(field) for field in key_fields)
+
+def canonicalize_url(url):
+    """
+    去重用的 URL 规范化：协议和域名小写、去掉锚点和末尾斜杠
+    """
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+class ResultPipeline:
+    """
+    结果后处理：一次遍历完成过滤无效行、日期格式化和去重，按页调用，去重状态跨页保留。
+    去重键为关键字段规范化后的 64 位哈希（置顶通知每页重复出现时只保留第一次）；
+    未指定 key_fields 时按字段关键词表识别标题 / 链接字段，与 row_filter 共用。
+    """
+
+    def __init__(self, dedupe=True, key_fields=None, row_filter='title_or_link', keywords=None):
+        self.dedupe = dedupe
+        self.row_filter = row_filter
+        self.key_fields = key_fields
+        self.keywords = keywords
+        self.seen = set()
+        self.duplicates = 0
+        self._date_keys = {}
+        # 字段名组合 -> 标题 / 链接字段，各页字段相同时只识别一次
+        self._title_link = {}
+
+    def _title_link_fields(self, row):
+        names = tuple(row)
+        fields = self._title_link.get(names)
+        if fields is None:
+            fields = self._title_link[names] = title_link_fields(names, self.keywords)
+            if not fields and ((self.dedupe and not self.key_fields) or self.row_filter == 'title_or_link'):
+                print(f'[Pipeline] No title/link field among {list(names)}, '
+                      f'set dedupe.key_fields or field_keywords to dedupe and filter rows', file=sys.stderr)
+        return fields
+
+    def _is_date_key(self, key):
+        is_date = self._date_keys.get(key)
+        if is_date is None:
+            is_date = self._date_keys[key] = '日期' in key or '时间' in key
+        return is_date
+
+    def _dedupe_key(self, row):
+        parts = []
+        for field in self.key_fields or self._title_link_fields(row):
+            value = str(row.get(field) or '').strip()
+            if value[:8].lower().startswith(('http://', 'https://')):
+                value = canonicalize_url(value)
+            else:
+                value = ' '.join(value.split())
+            parts.append(value)
+        if not any(parts):
+            return None
+        digest = hashlib.blake2b('\x1f'.join(parts).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big')
+
+    def remember(self, rows):
+        """续抓时把已输出过的行计入去重集合"""
+        if self.dedupe:
+            for row in rows:
+                key = self._dedupe_key(row)
+                if key is not None:
+                    self.seen.add(key)
+
+    def process(self, rows):
+        output = []
+        for row in rows:
+            if self.row_filter != 'any_field' and not is_valid_row(row, self.row_filter, key_fields=self._title_link_fields(row)):
+                continue
+
+            # 格式化日期字段为 YYYY-MM-DD
+            for key, value in row.items():
+                if value and self._is_date_key(key):
+                    row[key] = normalize_date(str(value))
+
+            if self.dedupe:
+                key = self._dedupe_key(row)
+                if key is not None:
+                    if key in self.seen:
+                        self.duplicates += 1
+                        continue
+                    self.seen.add(key)
+            output.append(row)
+        return output
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def current_rss_mb():
+    """当前进程常驻内存（MB），平台不支持时返回 None"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return round(int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1048576, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().rss / 1048576, 1)
+    except ImportError:
+        return None
+
+def peak_rss_mb():
+    """进程启动以来的峰值常驻内存（MB），平台不支持时返回 None"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return round(peak / (1048576 if sys.platform == 'darwin' else 1024), 1)
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / 1048576, 1)
+    except (ImportError, AttributeError):
+        return None
+
+class CrawlProfiler:
+    """
+    可选的抓取剖析：按页记录各阶段耗时、正文字节数（解压后，非网络传输量），以及按字段统计提取耗时和兜底次数。
+    未启用时所有方法直接返回，不影响正常抓取。
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.pages = []
+        self.fields = {}
+        self.current = None
+
+    def start_page(self, url):
+        if not self.enabled:
+            return
+        self.current = {"url": url, "body_bytes": 0, "containers": 0, "phases": {}, "fallbacks": {}}
+        self.pages.append(self.current)
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            phases = self.current['phases']
+            phases[name] = phases.get(name, 0) + (time.perf_counter() - started) * 1000
+
+    def add(self, name, ms):
+        if self.enabled:
+            phases = self.current['phases']
+            phases[name] = phases.get(name, 0) + ms
+
+    def set(self, key, value):
+        if self.enabled:
+            self.current[key] = value
+
+    def end_page(self):
+        """页面处理完、解析树释放后记录当前常驻内存；每页只记录一次"""
+        if self.enabled and self.current is not None:
+            self.current['rss_mb'] = current_rss_mb()
+            self.current = None
+
+    def record_field(self, field_name, started, fallback):
+        """started 为 time.perf_counter() 的起点；fallback 表示选择器未命中、走了启发式兜底"""
+        stats = self.fields.setdefault(field_name, {"ms": 0.0, "calls": 0, "fallbacks": 0})
+        stats['ms'] += (time.perf_counter() - started) * 1000
+        stats['calls'] += 1
+        if fallback:
+            stats['fallbacks'] += 1
+            page_fallbacks = self.current['fallbacks']
+            page_fallbacks[field_name] = page_fallbacks.get(field_name, 0) + 1
+
+    def report(self):
+        totals = {"body_bytes": 0}
+        for page in self.pages:
+            totals['body_bytes'] += page['body_bytes']
+            for name, ms in page['phases'].items():
+                page['phases'][name] = round(ms, 3)
+                totals[name] = round(totals.get(name, 0) + ms, 3)
+        for stats in self.fields.values():
+            stats['ms'] = round(stats['ms'], 3)
+        return {
+            "wall_ms": round((time.perf_counter() - self.started_at) * 1000, 3),
+            "totals": totals,
+            "fields": self.fields,
+            "pages": self.pages
+        }
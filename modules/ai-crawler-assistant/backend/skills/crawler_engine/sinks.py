@@ -0,0 +1,190 @@
+import csv
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+def _cell(value):
+    """列表 / 字典类字段（附件等）序列化为 JSON 字符串"""
+    if value is None:
+        return ""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+class BatchSink(ABC):
+    """
+    结果写出基类：crawl 每页完成后调用 write(rows)，行先进入缓冲，
+    满 batch_size 行时批量写出，内存中最多保留一个批次
+    """
+
+    def __init__(self, path, batch_size=500):
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self.buffer = []
+        self.columns = []
+        self.stats = {"path": path, "rows_written": 0, "batches": 0}
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, rows):
+        self.buffer.extend(rows)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        for row in batch:
+            for key in row:
+                if key not in self.columns:
+                    self._add_column(key)
+        self._write_batch(batch)
+        self.stats['rows_written'] += len(batch)
+        self.stats['batches'] += 1
+
+    def _add_column(self, name):
+        self.columns.append(name)
+
+    @abstractmethod
+    def _write_batch(self, batch):
+        """把一个批次写出；columns 已包含该批次出现的全部字段"""
+
+    def close(self):
+        self.flush()
+
+class CsvSink(BatchSink):
+    """
+    CSV 写出（UTF-8 BOM，Excel 可直接打开）。表头取第一个批次出现的字段，
+    之后新出现的字段无法补进表头，计入 stats.dropped_fields
+    """
+
+    def __init__(self, path, batch_size=500, append=False):
+        super().__init__(path, batch_size)
+        self.append = append and os.path.exists(path) and os.path.getsize(path) > 0
+        if self.append:
+            with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+                self.columns = next(csv.reader(f), [])
+        self.file = open(path, 'a' if self.append else 'w', encoding='utf-8' if self.append else 'utf-8-sig', newline='')
+        self.writer = csv.writer(self.file)
+        self.header_written = self.append
+        self.stats['dropped_fields'] = []
+
+    def _add_column(self, name):
+        if self.header_written:
+            if name not in self.stats['dropped_fields']:
+                self.stats['dropped_fields'].append(name)
+            return
+        self.columns.append(name)
+
+    def _write_batch(self, batch):
+        if not self.header_written:
+            self.writer.writerow(self.columns)
+            self.header_written = True
+        self.writer.writerows([_cell(row.get(c)) for c in self.columns] for row in batch)
+        self.file.flush()
+
+    def close(self):
+        super().close()
+        self.file.close()
+
+class SqliteSink(BatchSink):
+    """
+    SQLite 写出：按 key 字段（默认“链接”）upsert，重复抓取时更新已有行；
+    新字段自动 ALTER TABLE 增加列，另记录 crawled_at
+    """
+
+    def __init__(self, path, batch_size=500, table='crawl_results', key='链接'):
+        super().__init__(path, batch_size)
+        self.table = table
+        self.key = key
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {self._quote(table)} '
+            f'({self._quote(key)} TEXT PRIMARY KEY, "crawled_at" TEXT)'
+        )
+        self.columns = [row[1] for row in self.conn.execute(f'PRAGMA table_info({self._quote(table)})')
+                        if row[1] != 'crawled_at']
+        self.stats['table'] = table
+
+    @staticmethod
+    def _quote(name):
+        return '"' + str(name).replace('"', '""') + '"'
+
+    def _add_column(self, name):
+        self.conn.execute(f'ALTER TABLE {self._quote(self.table)} ADD COLUMN {self._quote(name)} TEXT')
+        self.columns.append(name)
+
+    def _write_batch(self, batch):
+        columns = self.columns + ['crawled_at']
+        names = ', '.join(self._quote(c) for c in columns)
+        updates = ', '.join(f'{self._quote(c)} = excluded.{self._quote(c)}' for c in columns if c != self.key)
+        sql = (f'INSERT INTO {self._quote(self.table)} ({names}) VALUES ({", ".join("?" * len(columns))}) '
+               f'ON CONFLICT({self._quote(self.key)}) DO UPDATE SET {updates}')
+        crawled_at = datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            self.conn.executemany(sql, (
+                # 没有链接的行以 NULL 作主键，不参与 upsert
+                [(_cell(row.get(c)) or None) if c == self.key else _cell(row.get(c)) for c in self.columns] + [crawled_at]
+                for row in batch
+            ))
+
+    def close(self):
+        super().close()
+        self.conn.close()
+
+class ParquetSink(BatchSink):
+    """
+    Parquet 列式写出（需要 pyarrow）：每个批次写成一个 row group，所有列为字符串。
+    schema 取第一个批次的字段，之后新出现的字段计入 stats.dropped_fields
+    """
+
+    def __init__(self, path, batch_size=5000):
+        super().__init__(path, batch_size)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError('Parquet 输出需要安装 pyarrow: pip install pyarrow')
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.writer = None
+        self.stats['dropped_fields'] = []
+
+    def _add_column(self, name):
+        if self.writer is not None:
+            if name not in self.stats['dropped_fields']:
+                self.stats['dropped_fields'].append(name)
+            return
+        self.columns.append(name)
+
+    def _write_batch(self, batch):
+        if self.writer is None:
+            schema = self.pa.schema([(c, self.pa.string()) for c in self.columns])
+            self.writer = self.pq.ParquetWriter(self.path, schema, compression='zstd')
+        arrays = {c: [_cell(row.get(c)) for row in batch] for c in self.columns}
+        self.writer.write_table(self.pa.table(arrays, schema=self.writer.schema))
+
+    def close(self):
+        super().close()
+        if self.writer is not None:
+            self.writer.close()
+
+SINK_TYPES = {'csv': CsvSink, 'sqlite': SqliteSink, 'parquet': ParquetSink}
+
+def open_sink(config):
+    """
+    按配置创建结果写出器：
+    {"type": "csv", "path": str, "batch_size": 500, "append": false}
+    {"type": "sqlite", "path": str, "table": "crawl_results", "key": "链接"}
+    {"type": "parquet", "path": str, "batch_size": 5000}
+    """
+    config = dict(config)
+    sink_type = config.pop('type', None)
+    if sink_type not in SINK_TYPES:
+        raise ValueError(f'Unknown sink type: {sink_type}')
+    if not config.get('path'):
+        raise ValueError('Sink path is required')
+    return SINK_TYPES[sink_type](**config)
@@ -0,0 +1,215 @@
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+
+from .attachments import attachment_extension
+from .config import ENGINE_PROFILES, RequestProfile, resolve_field_keywords
+from .encoding import detect_encoding
+from .extract import extract_items
+from .fetch import BodyLimiter, HttpCache, PolitenessScheduler
+from .frontier import UrlFrontier, VisitedSet, canonicalize_link
+from .pipeline import ResultPipeline
+from .profiler import CrawlProfiler, peak_rss_mb
+
+def crawl_site(source, selectors, site_config=None, options=None, sink=None):
+    """
+    全站抓取：从入口页出发按优先队列（浅层优先、各栏目轮流）发现站内链接，
+    并发抓取，页面中匹配到容器选择器的即视为列表页，按字段选择器提取数据
+    :param source: 入口 URL，或入口 URL 列表
+    :param selectors: 选择器配置（同 crawl）；container 为空时只做链接发现
+    :param site_config: {
+        "max_pages": 500, "max_depth": 3, "concurrency": 4,
+        "include": [正则], "exclude": [正则], 匹配规范化后的完整 URL，include 为空表示不限制
+        "allowed_domains": [域名]，默认入口页所在域名（含子域名），
+        "visited": {"memory_limit": 2000000, "spill": true} 已见集合超过 memory_limit 条后落盘
+      }
+    :param options: engine_profile / headers / timeout / field_keywords / row_filter /
+        scheduler / cache / dedupe / max_body_mb / profile 同 crawl
+    :param sink: 同 crawl，提供时结果不在内存中累积
+    :return: 结果中 listings 为发现的列表页 [{"url", "depth", "items"}]，site 为发现、抓取统计
+    """
+    site_config = site_config or {}
+    options = options or {}
+    profiler = CrawlProfiler(bool(options.get('profile')))
+    start_urls = [source] if isinstance(source, str) else list(source)
+    visited = VisitedSet(**(site_config.get('visited') or {}))
+    executor = None
+    try:
+        engine_profile = ENGINE_PROFILES[options.get('engine_profile', 'basic')]
+        request_profile = RequestProfile(
+            options.get('headers', engine_profile['headers']),
+            options.get('timeout', engine_profile['timeout'])
+        )
+        keywords = resolve_field_keywords(options.get('field_keywords', engine_profile['field_keywords']))
+        dedupe_config = options.get('dedupe', True)
+        pipeline = ResultPipeline(
+            dedupe=bool(dedupe_config),
+            key_fields=dedupe_config.get('key_fields') if isinstance(dedupe_config, dict) else None,
+            keywords=keywords,
+            row_filter=options.get('row_filter', engine_profile['row_filter'])
+        )
+
+        scheduler = None
+        scheduler_config = options.get('scheduler', True)
+        limiter = BodyLimiter(int(float(options.get('max_body_mb', 50)) * 1024 * 1024))
+        base_get = limiter.wrap(requests.get)
+        if scheduler_config:
+            scheduler = PolitenessScheduler(**(scheduler_config if isinstance(scheduler_config, dict) else {}))
+            base_get = scheduler.wrap(base_get)
+        cache = None
+        if options.get('cache'):
+            cache_config = options['cache'] if isinstance(options['cache'], dict) else {}
+            cache = HttpCache(cache_config.get('dir'), cache_config.get('ttl', 3600), cache_config.get('max_size_mb', 200), base_get)
+        http_get = cache.get if cache is not None else base_get
+
+        max_pages = int(site_config.get('max_pages', 500))
+        max_depth = int(site_config.get('max_depth', 3))
+        concurrency = max(1, int(site_config.get('concurrency', 4)))
+        include = [re.compile(p) for p in site_config.get('include', [])]
+        exclude = [re.compile(p) for p in site_config.get('exclude', [])]
+        allowed_domains = [d.lower() for d in site_config.get('allowed_domains') or
+                           [urlsplit(u).hostname or '' for u in start_urls]]
+
+        def allowed(url):
+            host = urlsplit(url).hostname or ''
+            if not any(host == d or host.endswith('.' + d) for d in allowed_domains):
+                return False
+            if attachment_extension(url):
+                return False
+            if include and not any(p.search(url) for p in include):
+                return False
+            return not any(p.search(url) for p in exclude)
+
+        frontier = UrlFrontier()
+        for url in start_urls:
+            url = canonicalize_link(url)
+            if url and visited.add(url):
+                frontier.push(url, 0)
+
+        def fetch(url):
+            """在线程中抓取并解码；非 HTML 响应返回 None"""
+            started = time.perf_counter()
+            response = http_get(url, headers=request_profile.headers(start_urls[0]), timeout=request_profile.timeout)
+            fetch_ms = (time.perf_counter() - started) * 1000
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', 'text/html').lower()
+            if 'html' not in content_type:
+                return response.url, None, len(response.content), fetch_ms
+            if response.encoding == 'ISO-8859-1':
+                response.encoding = detect_encoding(response.content, url)
+            return response.url, response.text, len(response.content), fetch_ms
+
+        container_selector = selectors.get('container')
+        fields = selectors.get('fields', {})
+        all_results = []
+        listings = []
+        total_count = 0
+        stats = {"fetched": 0, "failed": 0, "non_html": 0, "discovered": len(frontier)}
+
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        in_flight = {}
+        # 解析与提取在主线程进行，工作线程只做网络请求和解码
+        while frontier or in_flight:
+            while frontier and len(in_flight) < concurrency and stats['fetched'] + stats['failed'] + len(in_flight) < max_pages:
+                url, depth = frontier.pop()
+                in_flight[executor.submit(fetch, url)] = (url, depth)
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, depth = in_flight.pop(future)
+                try:
+                    final_url, html_content, size, fetch_ms = future.result()
+                except Exception as e:
+                    stats['failed'] += 1
+                    print(f'[Site] Failed {url}: {e}', file=sys.stderr)
+                    continue
+                stats['fetched'] += 1
+                if final_url != url:
+                    # 重定向后的地址也记为已见
+                    visited.add(canonicalize_link(final_url) or url)
+                if html_content is None:
+                    stats['non_html'] += 1
+                    continue
+
+                profiler.start_page(url)
+                profiler.add('fetch', fetch_ms)
+                profiler.set('body_bytes', size)
+                with profiler.phase('parse'):
+                    soup = BeautifulSoup(html_content, 'html.parser')
+
+                if container_selector:
+                    with profiler.phase('container_select'):
+                        containers = soup.select(container_selector)
+                    profiler.set('containers', len(containers))
+                    if containers:
+                        with profiler.phase('extract'):
+                            rows = pipeline.process(extract_items(containers, fields, final_url, keywords, profiler))
+                        for row in rows:
+                            row['来源页'] = final_url
+                        listings.append({"url": final_url, "depth": depth, "items": len(rows)})
+                        print(f'[Site] Listing {final_url} (depth {depth}): {len(rows)} items', file=sys.stderr)
+                        total_count += len(rows)
+                        if sink is not None:
+                            sink(rows)
+                        else:
+                            all_results.extend(rows)
+
+                if depth >= max_depth:
+                    soup.decompose()
+                    profiler.end_page()
+                    continue
+                with profiler.phase('links'):
+                    for anchor in soup.find_all('a', href=True):
+                        href = anchor['href'].strip()
+                        if not href or href.startswith(('javascript:', 'mailto:', 'tel:', '#')):
+                            continue
+                        link = canonicalize_link(urljoin(final_url, href))
+                        if link and allowed(link) and visited.add(link):
+                            frontier.push(link, depth + 1)
+                            stats['discovered'] += 1
+                soup.decompose()
+                profiler.end_page()
+
+        stats['visited'] = len(visited)
+        stats['frontier_remaining'] = len(frontier)
+        stats['spilled'] = visited.spill_path is not None
+        result = {
+            "success": True,
+            "data": all_results,
+            "count": total_count,
+            "duplicates_removed": pipeline.duplicates,
+            "pages_crawled": stats['fetched'],
+            "peak_rss_mb": peak_rss_mb(),
+            "listings": listings,
+            "site": stats,
+            "transfer": limiter.stats
+        }
+        if scheduler is not None:
+            result["scheduler"] = scheduler.stats
+        if cache is not None:
+            result["cache"] = cache.stats
+        if profiler.enabled:
+            result["profile"] = profiler.report()
+        return result
+
+    except Exception as e:
+        import traceback
+        result = {
+            "success": False,
+            "error": str(e),
+            "trace": traceback.format_exc()
+        }
+        if profiler.enabled:
+            result["profile"] = profiler.report()
+        return result
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        visited.close()
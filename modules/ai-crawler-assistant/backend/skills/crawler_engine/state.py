@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+from .config import get_state_dir
+
+def item_fingerprint(item):
+    """
+    条目指纹：标题 + 链接 的哈希；两者都为空时退化为全部字段值
+    """
+    title = str(item.get('标题') or '').strip()
+    link = str(item.get('链接') or '').strip()
+    if title or link:
+        raw = f'{title}\x1f{link}'
+    else:
+        raw = '\x1f'.join(str(v).strip() for v in item.values() if v)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+class FingerprintStore:
+    """
+    增量抓取指纹库：按来源持久化已见条目的指纹，以及首页的 ETag / Last-Modified
+    """
+    MAX_FINGERPRINTS = 50000
+
+    def __init__(self, source_key):
+        name = hashlib.sha1(source_key.encode('utf-8')).hexdigest()
+        self.path = os.path.join(get_state_dir('fingerprints'), f'{name}.json')
+        # dict 保留插入顺序，超出上限时淘汰最早的指纹
+        self.fingerprints = {}
+        self.etag = None
+        self.last_modified = None
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                self.fingerprints = dict.fromkeys(state.get('fingerprints', []))
+                self.etag = state.get('etag')
+                self.last_modified = state.get('last_modified')
+            except Exception as e:
+                print(f'[Incremental] Fingerprint store unreadable, starting fresh: {e}', file=sys.stderr)
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self.fingerprints
+
+    def add(self, fingerprint):
+        self.fingerprints[fingerprint] = None
+
+    def conditional_headers(self):
+        """首页条件请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def save(self):
+        fingerprints = list(self.fingerprints)[-self.MAX_FINGERPRINTS:]
+        state = {
+            "fingerprints": fingerprints,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "updated_at": datetime.now().isoformat(timespec='seconds')
+        }
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+class CrawlCheckpoint:
+    """
+    断点续抓：每页完成后把进度（下一页 URL、已抓页数、条目数）写入 <job_id>.json，
+    条目追加写入 <job_id>.items.ndjson，避免每页重写全部已抓数据
+    """
+
+    def __init__(self, job_id):
+        name = re.sub(r'[^\w.-]', '_', str(job_id))
+        base = os.path.join(get_state_dir('checkpoints'), name)
+        self.state_path = base + '.json'
+        self.items_path = base + '.items.ndjson'
+        self.item_count = 0
+
+    def load(self):
+        """
+        读取断点，返回 (state, items)；没有断点时返回 (None, [])。
+        条目文件中超出 item_count 的部分属于未完成的页，直接截断
+        """
+        if not os.path.exists(self.state_path):
+            return None, []
+        with open(self.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        self.item_count = state.get('item_count', 0)
+
+        items = []
+        if os.path.exists(self.items_path):
+            with open(self.items_path, 'r+', encoding='utf-8') as f:
+                while len(items) < self.item_count:
+                    line = f.readline()
+                    if not line:
+                        break
+                    items.append(json.loads(line))
+                f.truncate(f.tell())
+        self.item_count = len(items)
+        return state, items
+
+    def append_items(self, rows):
+        with open(self.items_path, 'a', encoding='utf-8') as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + '\n')
+        self.item_count += len(rows)
+
+    def save(self, **state):
+        state['item_count'] = self.item_count
+        state['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        with open(self.state_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(self.state_path + '.tmp', self.state_path)
+
+    def clear(self):
+        for path in (self.state_path, self.items_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.item_count = 0
@@ -0,0 +1,137 @@
+from urllib.parse import urljoin
+
+def find_table(soup, selector=None):
+    """
+    定位数据表格：指定选择器时取第一个匹配，否则取行数最多的 table
+    """
+    if selector:
+        return soup.select_one(selector)
+    best, best_rows = None, 0
+    for table in soup.find_all('table'):
+        rows = len(_table_rows(table))
+        if rows > best_rows:
+            best, best_rows = table, rows
+    return best
+
+def _table_rows(table):
+    """表格自身的行（thead/tbody/tfoot 下或直接子级的 tr），不含嵌套表格的行"""
+    rows = []
+    for child in table.children:
+        name = getattr(child, 'name', None)
+        if name == 'tr':
+            rows.append(child)
+        elif name in ('thead', 'tbody', 'tfoot'):
+            rows.extend(c for c in child.children if getattr(c, 'name', None) == 'tr')
+    return rows
+
+def _span(cell, attr):
+    try:
+        return max(1, min(int(cell.get(attr, 1)), 1000))
+    except (TypeError, ValueError):
+        return 1
+
+def table_grid(table, base_url=None):
+    """
+    一次线性遍历把表格展开为二维网格，按 colspan / rowspan 复制单元格。
+    每个单元格为 (文本, 第一个链接的绝对地址, 是否 th)；返回 (grid, 每行是否在 thead 中)
+    """
+    grid = []
+    in_thead = []
+    # 列号 -> [下方还要占用的行数, 单元格]
+    pending = {}
+
+    def take_pending(col, values):
+        entry = pending[col]
+        values.append(entry[1])
+        entry[0] -= 1
+        if entry[0] <= 0:
+            del pending[col]
+
+    for row in _table_rows(table):
+        values = []
+        col = 0
+        for cell in row.children:
+            if getattr(cell, 'name', None) not in ('td', 'th'):
+                continue
+            while col in pending:
+                take_pending(col, values)
+                col += 1
+            anchor = cell.find('a', href=True)
+            href = anchor['href'].strip() if anchor else ''
+            if href and base_url and not href.startswith('javascript:'):
+                href = urljoin(base_url, href)
+            value = (cell.get_text(' ', strip=True), href, cell.name == 'th')
+            rowspan = _span(cell, 'rowspan')
+            for _ in range(_span(cell, 'colspan')):
+                values.append(value)
+                if rowspan > 1:
+                    pending[col] = [rowspan - 1, value]
+                col += 1
+        # 行尾还有被上方单元格跨行占用的列
+        while col in pending:
+            take_pending(col, values)
+            col += 1
+        grid.append(values)
+        in_thead.append(row.parent is not None and row.parent.name == 'thead')
+    return grid, in_thead
+
+def extract_table(soup, table_selector=None, fields=None, base_url=None):
+    """
+    表格模式提取：表头映射为字段名，数据行逐行输出，不对单元格逐个执行 CSS 选择器
+    :param table_selector: 表格选择器，为空时自动选择行数最多的表格
+    :param fields: {字段名: 表头文本 | 列号(从 1 开始)}，表头文本可加 ::attr(href) 取单元格链接；
+        为空时每列以表头文本为字段名，并附加每行第一个链接为“链接”
+    """
+    table = find_table(soup, table_selector)
+    if table is None:
+        return []
+    grid, in_thead = table_grid(table, base_url)
+
+    # 表头：thead 中的行，或开头全部由 th 组成的行；多级表头按列拼接
+    header_count = 0
+    for values, is_head in zip(grid, in_thead):
+        if values and (is_head or all(v[2] for v in values)):
+            header_count += 1
+        else:
+            break
+    width = max((len(values) for values in grid), default=0)
+    headers = []
+    for col in range(width):
+        parts = []
+        for values in grid[:header_count]:
+            text = values[col][0] if col < len(values) else ''
+            if text and text not in parts:
+                parts.append(text)
+        headers.append('-'.join(parts) or f'列{col + 1}')
+
+    columns = []
+    if fields:
+        for field_name, spec in fields.items():
+            attr = None
+            if isinstance(spec, str) and '::attr(' in spec:
+                spec, attr = spec.split('::attr(', 1)[0].strip(), 'href'
+            if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+                col = int(spec) - 1
+            else:
+                col = next((i for i, h in enumerate(headers) if h == spec), None)
+                if col is None:
+                    col = next((i for i, h in enumerate(headers) if spec and spec in h), -1)
+            columns.append((field_name, col, attr))
+    else:
+        columns = [(header, col, None) for col, header in enumerate(headers)]
+    add_link = not fields and '链接' not in headers
+
+    rows = []
+    for values in grid[header_count:]:
+        if not any(v[0] or v[1] for v in values):
+            continue
+        data = {}
+        for field_name, col, attr in columns:
+            if 0 <= col < len(values):
+                data[field_name] = values[col][1] if attr else values[col][0]
+            else:
+                data[field_name] = ""
+        if add_link:
+            data['链接'] = next((v[1] for v in values if v[1]), "")
+        rows.append(data)
+    return rows
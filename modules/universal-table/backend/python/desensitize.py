@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 import argparse
 import csv
+import itertools
 import json
 import os
 import random
 import re
 import sys
-from typing import Any, Dict, List
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 
 def load_json(value: str, default: Any) -> Any:
@@ -18,20 +20,28 @@ def load_json(value: str, default: Any) -> Any:
         return default
 
 
+PHONE_PATTERN = re.compile(r'(1[3-9]\d)\d{4}(\d{4})')
+ID_CARD_PATTERN = re.compile(r'([1-9]\d{2})\d{11,14}([\dXx]{4})')
+BANK_CARD_PATTERN = re.compile(r'(\d{4})\d{8,11}(\d{4})')
+EMAIL_PATTERN = re.compile(r'([A-Za-z0-9._%+-]{2})[A-Za-z0-9._%+-]*(@[A-Za-z0-9.-]+\.[A-Za-z]{2,})')
+# 四条规则至少需要 11 位连续数字或 @，不含这些的文本一次扫描即可跳过
+TEXT_MASK_CANDIDATE = re.compile(r'\d{11}|@')
+
+
 def mask_phone(text: str) -> str:
-    return re.sub(r'(1[3-9]\d)\d{4}(\d{4})', r'\1****\2', text)
+    return PHONE_PATTERN.sub(r'\1****\2', text)
 
 
 def mask_id_card(text: str) -> str:
-    return re.sub(r'([1-9]\d{2})\d{11,14}([\dXx]{4})', r'\1********\2', text)
+    return ID_CARD_PATTERN.sub(r'\1********\2', text)
 
 
 def mask_bank_card(text: str) -> str:
-    return re.sub(r'(\d{4})\d{8,11}(\d{4})', r'\1********\2', text)
+    return BANK_CARD_PATTERN.sub(r'\1********\2', text)
 
 
 def mask_email(text: str) -> str:
-    return re.sub(r'([A-Za-z0-9._%+-]{2})[A-Za-z0-9._%+-]*(@[A-Za-z0-9.-]+\.[A-Za-z]{2,})', r'\1***\2', text)
+    return EMAIL_PATTERN.sub(r'\1***\2', text)
 
 
 def mask_name(text: str) -> str:
@@ -41,6 +51,8 @@ def mask_name(text: str) -> str:
 
 
 def apply_text_mask(text: str) -> str:
+    if not TEXT_MASK_CANDIDATE.search(text):
+        return text
     text = mask_phone(text)
     text = mask_id_card(text)
     text = mask_bank_card(text)
@@ -117,9 +129,9 @@ def fake_value(header: str, sample: Any, field_type: str) -> Any:
     return f"示例{header}"
 
 
-def load_rows_from_csv(file_path: str) -> List[Dict[str, Any]]:
+def load_rows_from_csv(file_path: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
     with open(file_path, 'r', encoding='utf-8-sig', errors='ignore', newline='') as handle:
-        return list(csv.DictReader(handle))
+        return list(itertools.islice(csv.DictReader(handle), limit))
 
 
 def save_rows_to_csv(file_path: str, rows: List[Dict[str, Any]]) -> None:
@@ -130,32 +142,36 @@ def save_rows_to_csv(file_path: str, rows: List[Dict[str, Any]]) -> None:
         writer.writerows(rows)
 
 
-def load_rows_from_xlsx(file_path: str) -> List[Dict[str, Any]]:
+def sheet_records(sheet) -> Tuple[List[str], Iterator[Dict[str, Any]]]:
+    # 首行为表头，空表头的列忽略；返回表头和逐行产出的记录
+    rows = sheet.iter_rows(values_only=True)
+    first = next(rows, None) or ()
+    columns = [(index, str(item).strip()) for index, item in enumerate(first) if item is not None and str(item).strip()]
+    headers = list(dict.fromkeys(header for _, header in columns))
+    if not columns:
+        return headers, iter(())
+    records = ({header: row[index] if index < len(row) else '' for index, header in columns} for row in rows)
+    return headers, records
+
+
+def load_rows_from_xlsx(file_path: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
     from openpyxl import load_workbook
 
-    workbook = load_workbook(file_path)
-    sheet = workbook[workbook.sheetnames[0]]
-    data = list(sheet.iter_rows(values_only=True))
-    workbook.close()
-    if not data:
-        return []
-    headers = [str(item).strip() if item is not None else '' for item in data[0]]
-    rows = []
-    for row in data[1:]:
-        item = {}
-        for index, header in enumerate(headers):
-            if header:
-                item[header] = row[index] if index < len(row) else ''
-        if item:
-            rows.append(item)
-    return rows
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        sheet.reset_dimensions()
+        _, records = sheet_records(sheet)
+        return list(itertools.islice(records, limit))
+    finally:
+        workbook.close()
 
 
 def save_rows_to_xlsx(file_path: str, rows: List[Dict[str, Any]]) -> None:
     from openpyxl import Workbook
 
-    workbook = Workbook()
-    sheet = workbook.active
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
     headers = list(rows[0].keys()) if rows else []
     if headers:
         sheet.append(headers)
@@ -164,6 +180,76 @@ def save_rows_to_xlsx(file_path: str, rows: List[Dict[str, Any]]) -> None:
     workbook.save(file_path)
 
 
+class ProgressReporter:
+    """向 stderr 输出已处理行数和速度，至多每 interval 秒一行"""
+
+    def __init__(self, label: str, interval: float = 2.0):
+        self.label = label
+        self.interval = interval
+        self.rows = 0
+        self.started = time.monotonic()
+        self.last_report = self.started
+
+    def advance(self, count: int) -> None:
+        self.rows += count
+        now = time.monotonic()
+        if now - self.last_report >= self.interval:
+            self.last_report = now
+            self.report(now)
+
+    def report(self, now: Optional[float] = None) -> None:
+        elapsed = max((now or time.monotonic()) - self.started, 1e-6)
+        print(f'[{self.label}] {self.rows} rows, {self.rows / elapsed:.0f} rows/s', file=sys.stderr, flush=True)
+
+
+def mask_csv_stream(input_path: str, output_path: str, plan_fields: List[Dict[str, Any]], chunk_size: int = 10000) -> int:
+    # 分块读取、脱敏、写出，内存中最多保留一个块
+    progress = ProgressReporter('Mask')
+    with open(input_path, 'r', encoding='utf-8-sig', errors='ignore', newline='') as source, \
+            open(output_path, 'w', encoding='utf-8-sig', newline='') as target:
+        reader = csv.DictReader(source)
+        headers = list(reader.fieldnames or [])
+        writer = csv.writer(target)
+        writer.writerow(headers)
+        while True:
+            chunk = list(itertools.islice(reader, chunk_size))
+            if not chunk:
+                break
+            writer.writerows([row.get(header, '') for header in headers] for row in mask_rows(chunk, plan_fields))
+            progress.advance(len(chunk))
+    progress.report()
+    return progress.rows
+
+
+def mask_xlsx_stream(input_path: str, output_path: str, plan_fields: List[Dict[str, Any]], chunk_size: int = 10000) -> int:
+    # 只读模式逐行读取、只写模式逐行写出，所有工作表按原表名依次处理
+    from openpyxl import Workbook, load_workbook
+
+    progress = ProgressReporter('Mask')
+    source = load_workbook(input_path, read_only=True)
+    target = Workbook(write_only=True)
+    try:
+        for sheet in source.worksheets:
+            # 部分导出文件记录的表格范围不准确，按实际内容读取
+            sheet.reset_dimensions()
+            output = target.create_sheet(sheet.title)
+            headers, records = sheet_records(sheet)
+            if headers:
+                output.append(headers)
+            while True:
+                chunk = list(itertools.islice(records, chunk_size))
+                if not chunk:
+                    break
+                for row in mask_rows(chunk, plan_fields):
+                    output.append([row.get(header, '') for header in headers])
+                progress.advance(len(chunk))
+        target.save(output_path)
+    finally:
+        source.close()
+    progress.report()
+    return progress.rows
+
+
 def load_docx_parts(file_path: str):
     from docx import Document
 
@@ -234,15 +320,31 @@ def save_pdf_text(file_path: str, text: str) -> None:
     c.save()
 
 
+TYPE_MASKERS = {
+    'phone': mask_phone,
+    'idCard': mask_id_card,
+    'email': mask_email,
+    'bankCard': mask_bank_card,
+    'name': mask_name,
+}
+
+
+def column_masker(header: str, plan_fields: List[Dict[str, Any]]) -> Callable[[Any], str]:
+    sensitive_type = explicit_type_for(header, plan_fields)
+    mask = TYPE_MASKERS.get(sensitive_type, apply_text_mask)
+    return lambda value: mask('' if value is None else str(value))
+
+
 def mask_rows(rows: List[Dict[str, Any]], plan_fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    result = []
-    for row in rows:
-        item = {}
-        for header, value in row.items():
-            sensitive_type = explicit_type_for(header, plan_fields)
-            item[header] = mask_value(value, sensitive_type) if sensitive_type else apply_text_mask('' if value is None else str(value))
-        result.append(item)
-    return result
+    # 按列处理：每列的敏感类型只解析一次，整列套用同一组预编译规则
+    if not rows:
+        return []
+    headers = list(dict.fromkeys(header for row in rows for header in row))
+    columns = [
+        list(map(column_masker(header, plan_fields), [row.get(header) for row in rows]))
+        for header in headers
+    ]
+    return [dict(zip(headers, values)) for values in zip(*columns)]
 
 
 def build_test_rows(rows: List[Dict[str, Any]], schema: List[Dict[str, Any]], count: int) -> List[Dict[str, Any]]:
@@ -280,13 +382,19 @@ def main() -> None:
     schema = load_json(args.schema_json, [])
 
     if ext == '.csv':
-        rows = load_rows_from_csv(args.input)
-        output_rows = mask_rows(rows, plan_fields) if args.action == 'mask' else build_test_rows(rows, schema, args.count)
-        save_rows_to_csv(args.output, output_rows)
+        if args.action == 'mask':
+            mask_csv_stream(args.input, args.output, plan_fields)
+        else:
+            # 测试数据只参考前 count 行样本
+            rows = load_rows_from_csv(args.input, max(1, args.count))
+            save_rows_to_csv(args.output, build_test_rows(rows, schema, args.count))
     elif ext in ('.xlsx', '.xlsm'):
-        rows = load_rows_from_xlsx(args.input)
-        output_rows = mask_rows(rows, plan_fields) if args.action == 'mask' else build_test_rows(rows, schema, args.count)
-        save_rows_to_xlsx(args.output, output_rows)
+        if args.action == 'mask':
+            mask_xlsx_stream(args.input, args.output, plan_fields)
+        else:
+            # schema 描述的是第一个工作表，样本同样只取前 count 行
+            rows = load_rows_from_xlsx(args.input, max(1, args.count))
+            save_rows_to_xlsx(args.output, build_test_rows(rows, schema, args.count))
     elif ext == '.docx':
         paragraphs, tables = load_docx_parts(args.input)
         if args.action == 'mask':
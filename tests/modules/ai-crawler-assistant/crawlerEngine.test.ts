@@ -0,0 +1,71 @@
+/**
+ * 爬虫引擎（Python crawler_engine）结果后处理测试
+ */
+
+import { describe, it, expect, beforeAll, afterAll } from 'vitest';
+import { execFileSync } from 'child_process';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+
+const enginePath = path.join(process.cwd(), 'modules', 'ai-crawler-assistant', 'backend', 'skills', 'engine.py');
+const pythonPath = process.env.PYTHON_PATH || (process.platform === 'win32' ? 'python' : 'python3');
+
+describe('爬虫引擎结果后处理', () => {
+  let workDir: string;
+  let pagePath: string;
+
+  beforeAll(() => {
+    workDir = fs.mkdtempSync(path.join(os.tmpdir(), 'crawler-engine-'));
+    pagePath = path.join(workDir, 'list.html');
+    fs.writeFileSync(pagePath, `<html><body><ul class="list">
+      <li><a href="/n/1.html">Notice one</a><span>2025-01-02</span></li>
+      <li><a href="/n/2.html">Notice two</a><span>2025-01-03</span></li>
+      <li><a href="/n/1.html">Notice one</a><span>2025-01-02</span></li>
+      <li><span>2025-01-04</span></li>
+    </ul></body></html>`, 'utf-8');
+  });
+
+  afterAll(() => {
+    fs.rmSync(workDir, { recursive: true, force: true });
+  });
+
+  const crawl = (fields: Record<string, string>, options: Record<string, any>) => {
+    const stdout = execFileSync(pythonPath, [
+      enginePath,
+      pagePath,
+      JSON.stringify({ container: 'ul.list li', fields }),
+      'http://example.com/',
+      'null',
+      JSON.stringify(options),
+    ], {
+      encoding: 'utf-8',
+      env: { ...process.env, CRAWLER_STATE_DIR: path.join(workDir, 'state') },
+      stdio: ['ignore', 'pipe', 'ignore'],
+    });
+    return JSON.parse(stdout);
+  };
+
+  it('英文字段名也应按标题/链接去重并过滤无效行', () => {
+    const result = crawl(
+      { title: 'a', url: 'a::attr(href)', date: 'span' },
+      { engine_profile: 'browser', row_filter: 'title_or_link' },
+    );
+
+    expect(result.success).toBe(true);
+    expect(result.duplicates_removed).toBe(1);
+    expect(result.count).toBe(2);
+    expect(result.data.map((row: any) => row.url)).toEqual([
+      'http://example.com/n/1.html',
+      'http://example.com/n/2.html',
+    ]);
+  });
+
+  it('中文字段名保持原有去重行为', () => {
+    const result = crawl({ 标题: 'a', 链接: 'a::attr(href)' }, { engine_profile: 'basic' });
+
+    expect(result.success).toBe(true);
+    expect(result.duplicates_removed).toBe(1);
+    expect(result.count).toBe(2);
+  });
+});
@@ -0,0 +1,338 @@
+"""
+爬虫引擎基准测试
+
+在本地 HTTP 服务上提供一组门户列表页样本（GBK / UTF-8、小页 / 大页、有无分页、
+详情页），以不同模式运行 crawl，输出 pages/s、items/s、各阶段墙钟耗时、整体 CPU 时间和峰值内存。
+每个场景在独立子进程中运行，峰值 RSS 互不干扰。
+
+用法:
+    python tests/performance/crawler_engine_bench.py                    # 运行全部场景
+    python tests/performance/crawler_engine_bench.py -k gbk --repeat 3  # 按名称过滤、重复取中位数
+    python tests/performance/crawler_engine_bench.py --corpus DIR       # 额外使用保存的真实页面
+    python tests/performance/crawler_engine_bench.py --save base.json
+    python tests/performance/crawler_engine_bench.py --compare base.json --max-regression 0.2
+
+--corpus 目录下放 manifest.json：
+    [{"name": "...", "entry": "list/index.html", "selectors": {...}, "pagination": {...}}]
+"""
+import argparse
+import http.server
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ENGINE_PACKAGE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    '..', '..', 'modules', 'ai-crawler-assistant', 'backend', 'skills'
+)
+
+LIST_SELECTORS = {
+    "container": "ul.news-list li",
+    "fields": {"标题": "a", "链接": "a::attr(href)", "发布日期": "span.date"}
+}
+
+# 选择器全部失配，强制走 get_field_data 的启发式兜底链路
+MISS_SELECTORS = {
+    "container": "ul.news-list li",
+    "fields": {"标题": "h3.title", "链接": "h3.title a::attr(href)", "发布日期": "em.time", "类型": "i.tag"}
+}
+
+TABLE_SELECTORS = {
+    "container": "table.data tr.row",
+    "fields": {"标题": "td:nth-child(2) a", "链接": "td:nth-child(2) a::attr(href)", "发布日期": "td:nth-child(3)"}
+}
+
+WORDS = ['关于', '开展', '全省', '年度', '专项', '检查', '工作', '的通知', '印发', '实施方案',
+         '公示', '名单', '政策', '解读', '征求意见', '管理办法', '统计', '公报', '招标', '公告']
+
+
+def _title(rng):
+    return ''.join(rng.choice(WORDS) for _ in range(rng.randint(4, 9)))
+
+
+def _boilerplate(rng, size):
+    """门户页常见的导航、脚本和样式噪声"""
+    nav = ''.join(f'<li class="nav-item"><a href="/col/{i}/index.html" style="color:#333">{_title(rng)[:6]}</a></li>'
+                  for i in range(40))
+    script = '<script>var _hmt=_hmt||[];(function(){var hm=document.createElement("script");})();</script>'
+    filler = ''.join(f'<div class="side-block" data-spm="s{i}"><p>{_title(rng)}</p></div>' for i in range(size))
+    return f'<div class="header"><ul class="nav">{nav}</ul></div>{script}<div class="sidebar">{filler}</div>'
+
+
+def _list_page(rng, site, page, pages, items, encoding, with_meta, noise, table=False):
+    if table:
+        rows = ''.join(
+            f'<tr class="row"><td>{page * items + i}</td><td><a href="/{site}/art/{page}_{i}.html">{_title(rng)}</a></td>'
+            f'<td>2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}</td></tr>'
+            for i in range(items))
+        body = f'<table class="data"><tr><th>序号</th><th>标题</th><th>日期</th></tr>{rows}</table>'
+    else:
+        body = '<ul class="news-list">' + ''.join(
+            f'<li><a href="/{site}/art/{page}_{i}.html" title="{_title(rng)}">{_title(rng)}</a>'
+            f'<span class="date">2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}</span></li>'
+            for i in range(items)) + '</ul>'
+
+    pager = ''
+    if pages > 1:
+        links = ''.join(f'<a href="index_{n}.html">{n}</a>' for n in range(2, pages + 1))
+        next_link = f'<a href="index_{page + 1}.html">下一页</a>' if page < pages else ''
+        pager = f'<div class="page"><a href="index.html">首页</a>{links}{next_link}<a href="index_{pages}.html">尾页</a></div>'
+
+    meta = f'<meta charset="{encoding}">' if with_meta else ''
+    html = (f'<!DOCTYPE html><html><head>{meta}<title>{site}</title>'
+            f'<style>.news-list li{{line-height:2}}</style></head><body>'
+            f'{_boilerplate(rng, noise)}<div class="main">{body}{pager}</div></body></html>')
+    return html.encode(encoding)
+
+
+def _detail_page(rng, encoding):
+    paragraphs = ''.join(f'<p style="text-indent:2em"><!-- p -->{_title(rng) * 3}</p>' for _ in range(30))
+    html = (f'<html><head><meta charset="{encoding}"></head><body>{_boilerplate(rng, 20)}'
+            f'<div class="info">发布单位：省人民政府办公厅</div>'
+            f'<div class="article" onclick="track()">{paragraphs}'
+            f'<a href="/files/a.pdf">附件1</a></div></body></html>')
+    return html.encode(encoding)
+
+
+def build_corpus(root):
+    """生成样本站点：目录名即站点名，列表页为 index.html / index_N.html"""
+    rng = random.Random(20250101)
+    sites = {
+        'gbk_small': dict(pages=10, items=20, encoding='gbk', with_meta=True, noise=30),
+        'gbk_nometa': dict(pages=10, items=20, encoding='gbk', with_meta=False, noise=30),
+        'utf8_small': dict(pages=10, items=20, encoding='utf-8', with_meta=False, noise=30),
+        'gbk_huge': dict(pages=3, items=3000, encoding='gbk', with_meta=True, noise=3000),
+        'utf8_single': dict(pages=1, items=50, encoding='utf-8', with_meta=True, noise=100),
+        'table_huge': dict(pages=1, items=5000, encoding='utf-8', with_meta=True, noise=50, table=True),
+    }
+    for site, spec in sites.items():
+        site_dir = os.path.join(root, site)
+        os.makedirs(os.path.join(site_dir, 'art'), exist_ok=True)
+        for page in range(1, spec['pages'] + 1):
+            name = 'index.html' if page == 1 else f'index_{page}.html'
+            with open(os.path.join(site_dir, name), 'wb') as f:
+                f.write(_list_page(rng, site, page, **spec))
+        if site in ('gbk_small', 'utf8_small'):
+            for page in range(1, spec['pages'] + 1):
+                for i in range(spec['items']):
+                    with open(os.path.join(site_dir, 'art', f'{page}_{i}.html'), 'wb') as f:
+                        f.write(_detail_page(rng, spec['encoding']))
+
+
+def builtin_scenarios(base):
+    paginated = {"enabled": True, "max_pages": 10}
+    no_scheduler = {"scheduler": False, "profile": True}
+    return [
+        dict(name='gbk_small_paginated', source=f'{base}/gbk_small/index.html',
+             selectors=LIST_SELECTORS, pagination=paginated, options=no_scheduler),
+        dict(name='gbk_nometa_paginated', source=f'{base}/gbk_nometa/index.html',
+             selectors=LIST_SELECTORS, pagination=paginated, options=no_scheduler),
+        dict(name='utf8_small_paginated', source=f'{base}/utf8_small/index.html',
+             selectors=LIST_SELECTORS, pagination=paginated, options=no_scheduler),
+        dict(name='gbk_small_url_template', source=f'{base}/gbk_small/index.html',
+             selectors=LIST_SELECTORS, pagination=dict(paginated, url_template='auto'), options=no_scheduler),
+        dict(name='gbk_huge_paginated', source=f'{base}/gbk_huge/index.html',
+             selectors=LIST_SELECTORS, pagination=paginated, options=no_scheduler),
+        dict(name='utf8_single_page', source=f'{base}/utf8_single/index.html',
+             selectors=LIST_SELECTORS, pagination=None, options=no_scheduler),
+        dict(name='selector_miss_fallback', source=f'{base}/gbk_small/index.html',
+             selectors=MISS_SELECTORS, pagination=paginated, options=no_scheduler),
+        dict(name='table_css_cells', source=f'{base}/table_huge/index.html',
+             selectors=TABLE_SELECTORS, pagination=None, options=no_scheduler),
+        dict(name='table_mode', source=f'{base}/table_huge/index.html',
+             selectors={"mode": "table", "table": "table.data",
+                        "fields": {"标题": "标题", "链接": "标题::attr(href)", "发布日期": "日期"}},
+             pagination=None, options=no_scheduler),
+        dict(name='utf8_detail_follow', source=f'{base}/utf8_small/index.html',
+             selectors=LIST_SELECTORS, pagination={"enabled": True, "max_pages": 3},
+             options=dict(no_scheduler, detail={"fields": {"正文": "div.article", "附件": "div.article a",
+                                                           "发布单位": "div.info"}})),
+        dict(name='gbk_small_ndjson', source=f'{base}/gbk_small/index.html',
+             selectors=LIST_SELECTORS, pagination=paginated, options=dict(no_scheduler, output='ndjson')),
+    ]
+
+
+def corpus_scenarios(corpus_dir, base):
+    with open(os.path.join(corpus_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return [dict(name=f"corpus_{entry['name']}", source=f"{base}/{entry['entry']}",
+                 selectors=entry['selectors'], pagination=entry.get('pagination'),
+                 options={"scheduler": False, "profile": True})
+            for entry in manifest]
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def guess_type(self, path):
+        # 与多数政府门户一致：Content-Type 不带 charset，走引擎的编码探测
+        return 'text/html' if path.endswith('.html') else super().guess_type(path)
+
+
+def serve(root):
+    handler = lambda *args, **kwargs: QuietHandler(*args, directory=root, **kwargs)
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_scenario(scenario):
+    """子进程内执行单个场景，返回指标"""
+    sys.dont_write_bytecode = True
+    sys.path.insert(0, os.path.normpath(ENGINE_PACKAGE_DIR))
+    from crawler_engine import crawl
+    from crawler_engine.profiler import peak_rss_mb
+
+    options = dict(scenario['options'])
+    streamed = options.pop('output', None) == 'ndjson'
+    streamed_rows = [0]
+
+    def sink(rows):
+        # 与 CLI 的 NDJSON 输出一致地序列化，计入开销
+        for row in rows:
+            json.dumps({"type": "item", "data": row}, ensure_ascii=False)
+        streamed_rows[0] += len(rows)
+
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    result = crawl(scenario['source'], scenario['selectors'], None, scenario['pagination'], options,
+                   sink=sink if streamed else None)
+    if not streamed:
+        json.dumps(result, ensure_ascii=True)
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+
+    if not result.get('success'):
+        return {"name": scenario['name'], "error": result.get('error')}
+    profile = result.get('profile', {})
+    totals = profile.get('totals', {})
+    pages = result.get('pages_crawled', 0)
+    items = result.get('count', 0)
+    return {
+        "name": scenario['name'],
+        "pages": pages,
+        "items": items,
+        "wall_s": round(wall, 4),
+        "cpu_s": round(cpu, 4),
+        "pages_per_s": round(pages / wall, 2) if wall else 0,
+        "items_per_s": round(items / wall, 1) if wall else 0,
+        "body_bytes": totals.get('body_bytes', 0),
+        "phases_wall_ms": {k: v for k, v in totals.items() if k != 'body_bytes'},
+        "fallbacks": {k: v['fallbacks'] for k, v in profile.get('fields', {}).items() if v['fallbacks']},
+        # 复用 profiler 的峰值内存统计，无法获取时为 None
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def run_in_subprocess(scenario, state_dir):
+    env = dict(os.environ, CRAWLER_STATE_DIR=state_dir, PYTHONDONTWRITEBYTECODE='1')
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', json.dumps(scenario)],
+                          capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        return {"name": scenario['name'], "error": proc.stderr.strip()[-500:]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def median_result(runs):
+    ok = [r for r in runs if 'error' not in r]
+    if not ok:
+        return runs[0]
+    result = dict(sorted(ok, key=lambda r: r['wall_s'])[len(ok) // 2])
+    peaks = [r['peak_rss_mb'] for r in ok if r['peak_rss_mb'] is not None]
+    result['peak_rss_mb'] = max(peaks) if peaks else None
+    return result
+
+
+def print_table(results):
+    header = f"{'scenario':<26}{'pages':>6}{'items':>7}{'wall s':>9}{'cpu s':>8}{'pages/s':>9}{'items/s':>10}{'rss MB':>8}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        if 'error' in r:
+            print(f"{r['name']:<26} ERROR {r['error']}")
+            continue
+        rss = f"{r['peak_rss_mb']:>8.1f}" if r['peak_rss_mb'] is not None else f"{'-':>8}"
+        print(f"{r['name']:<26}{r['pages']:>6}{r['items']:>7}{r['wall_s']:>9.3f}{r['cpu_s']:>8.3f}"
+              f"{r['pages_per_s']:>9.1f}{r['items_per_s']:>10.1f}{rss}")
+    print()
+    for r in results:
+        if 'error' in r:
+            continue
+        phases = ', '.join(f'{k}={v:.1f}' for k, v in sorted(r['phases_wall_ms'].items(), key=lambda kv: -kv[1]))
+        print(f"{r['name']} (wall ms): {phases}" + (f"  fallbacks={r['fallbacks']}" if r['fallbacks'] else ''))
+
+
+def compare(results, baseline_path, max_regression):
+    """对比基线，items/s 下降超过阈值的场景视为回归"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {r['name']: r for r in json.load(f)}
+    regressions = []
+    for r in results:
+        base = baseline.get(r['name'])
+        if not base or 'error' in r or 'error' in base or not base['items_per_s']:
+            continue
+        change = r['items_per_s'] / base['items_per_s'] - 1
+        print(f"{r['name']:<26} items/s {base['items_per_s']:>10.1f} -> {r['items_per_s']:>10.1f} ({change:+.1%})")
+        if change < -max_regression:
+            regressions.append(r['name'])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫引擎基准测试')
+    parser.add_argument('-k', dest='keyword', help='只运行名称包含该关键字的场景')
+    parser.add_argument('--repeat', type=int, default=1, help='每个场景重复次数，取耗时中位数')
+    parser.add_argument('--corpus', help='保存的真实页面目录（含 manifest.json）')
+    parser.add_argument('--save', help='把结果写入 JSON 文件，作为后续对比基线')
+    parser.add_argument('--compare', help='与基线 JSON 对比')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='允许的 items/s 最大降幅')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_scenario(json.loads(args.child)), ensure_ascii=False))
+        return
+
+    with tempfile.TemporaryDirectory(prefix='crawler-bench-') as workdir:
+        corpus_root = os.path.join(workdir, 'corpus')
+        build_corpus(corpus_root)
+        if args.corpus:
+            # 复制而不是软链接：Windows 下创建软链接需要额外权限
+            shutil.copytree(args.corpus, os.path.join(corpus_root, 'real'))
+
+        server = serve(corpus_root)
+        base = f'http://127.0.0.1:{server.server_address[1]}'
+        scenarios = builtin_scenarios(base)
+        if args.corpus:
+            scenarios += corpus_scenarios(args.corpus, f'{base}/real')
+        if args.keyword:
+            scenarios = [s for s in scenarios if args.keyword in s['name']]
+
+        results = []
+        for scenario in scenarios:
+            # 每次运行使用独立状态目录，避免编码记忆、缓存等影响结果
+            runs = [run_in_subprocess(scenario, tempfile.mkdtemp(dir=workdir)) for _ in range(args.repeat)]
+            results.append(median_result(runs))
+        server.shutdown()
+
+    print_table(results)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        print()
+        regressions = compare(results, args.compare, args.max_regression)
+        if regressions:
+            print(f'Regressions: {", ".join(regressions)}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()